@@ -1,14 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
-import json
+import threading
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import uuid
 
 # Import our resume analysis modules
-from routes.resume_analysis import resume_bp
-from routes.services.resume_analyzer import ResumeAnalyzer
+from routes.resume_analysis import (
+    resume_bp, analyzer, pipeline, result_cache, upload_storage, analysis_admission, upload_admission, entity_extractor,
+    duplicate_index, corpus_stats, compressed_store
+)
+from routes.services.upload_storage import file_digest
+from routes.services.response_utils import compress_response, parse_fields, project_fields, format_sse
+from routes.services.pdf_renderer import PDFRenderer, TEMPLATES, DEFAULT_TEMPLATE
+from routes.services.single_flight import SingleFlight
+from routes.services.admission import admission_required
 
 app = Flask(__name__)
 CORS(app)
@@ -16,13 +23,71 @@ CORS(app)
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['RETENTION_SWEEP_INTERVAL'] = 60 * 60  # seconds between retention sweeps
+# Per-artifact TTLs in seconds (None keeps forever); defaults live in upload_storage
+app.config['RETENTION_TTLS'] = {}
+app.config['QUICK_ANALYZE_BUDGET_MS'] = 50  # latency budget of the provisional quick-analyze tier
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
 # Create upload directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+upload_storage.init_app(app)
 
-# Initialize resume analyzer
-analyzer = ResumeAnalyzer()
+# Analyses, extracted text and generated resumes are stored gzip-compressed (level 0 turns it off)
+compressed_store.init_app(app)
+
+# Admission limits for the expensive routes, e.g. app.config['ANALYZE_MAX_CONCURRENT'] = 4
+analysis_admission.init_app(app)
+upload_admission.init_app(app)
+
+# Quick-analyze budgets
+pipeline.init_app(app)
+
+# PDFs of PDF_PARALLEL_MIN_PAGES or more are extracted in page ranges across PDF_EXTRACT_WORKERS processes
+analyzer.init_app(app)
+
+# Offline entity extraction uses a blank spaCy pipeline unless ENTITY_MODEL names a trained one
+entity_extractor.init_app(app)
+
+# Corpus aggregates are loaded from their snapshot beside the uploads
+corpus_stats.init_app(app)
+
+# Double-clicks and retries of /api/analyze share one run per file
+analysis_flights = SingleFlight()
+
+# Local PDF rendering for generated resumes; the retention sweep also expires the render cache
+pdf_renderer = PDFRenderer()
+pdf_renderer.init_app(app)
+upload_storage.on_sweep(pdf_renderer.prune_disk)
+
+_background_lock = threading.Lock()
+_background_started = False
+
+@app.before_request
+def start_background_tasks():
+    """Start the background services once per serving process, under app.run, flask run, WSGI or the test client
+
+    Deferred to the first request so CLI commands, the debug reloader's watcher
+    process and pool workers that import this module start nothing.
+    """
+    global _background_started
+    if _background_started:
+        return
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    # The first sweep runs immediately and computes per-user usage
+    upload_storage.start_sweeper()
+    # Signatures are reloaded in the background; lookups just see a smaller corpus until it finishes
+    threading.Thread(target=duplicate_index.load, args=(upload_storage,), name='duplicate-index-load', daemon=True).start()
+    # Without a snapshot, stored analyses are counted once so re-analyses can replace them
+    corpus_stats.start()
+    # The first long PDF should not wait for the fork server and page workers to start
+    threading.Thread(target=analyzer.warm_up, name='pdf-workers-warm-up', daemon=True).start()
+
+@app.after_request
+def compress_large_responses(response):
+    return compress_response(response, request.headers.get('Accept-Encoding', ''))
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -36,10 +101,17 @@ def home():
         "endpoints": {
             "upload": "/api/upload",
             "analyze": "/api/analyze",
+            "analyze_stream": "/api/analyze/<file_id>/stream",
             "results": "/api/results",
+            "full_report": "/api/resume/full-report",
+            "entities": "/api/resume/entities",
             "generate_resume": "/api/generate-resume",
             "download_generated": "/api/download-generated",
-            "health": "/api/health"
+            "resume_pdf": "/api/resume-pdf",
+            "health": "/api/health",
+            "cache_stats": "/api/cache/stats",
+            "storage_usage": "/api/storage/usage",
+            "admission_stats": "/api/admission/stats"
         }
     })
 
@@ -54,7 +126,67 @@ def health_check():
         }
     })
 
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify({
+        'results_cache': result_cache.stats(),
+        'analysis_flights': analysis_flights.stats(),
+        'pipeline_flights': pipeline.flights.stats(),
+        'duplicate_index': duplicate_index.stats(),
+        'speculative_extraction': pipeline.speculation_stats(),
+        'background_analysis': pipeline.schedule_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/storage/usage')
+def storage_usage():
+    user_id = request.args.get('userId')
+    return jsonify({
+        'usage': upload_storage.usage(user_id),
+        'last_sweep': upload_storage.last_sweep,
+        'retention_ttls': upload_storage.retention_ttls,
+        'compression': compressed_store.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.cli.command('reshard-uploads')
+def reshard_uploads_command():
+    """Move flat-layout uploads into sharded directories (safe while serving)"""
+    print(upload_storage.migrate())
+
+@app.cli.command('sweep-uploads')
+def sweep_uploads_command():
+    """Run one retention sweep and print what was deleted"""
+    print(upload_storage.sweep())
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the corpus aggregates from every stored analysis; running servers pick up the new snapshot on their next query"""
+    print(corpus_stats.rebuild())
+
+@app.route('/api/stats')
+def corpus_statistics():
+    """Skill frequency, score distributions and section coverage across analyzed resumes"""
+    try:
+        days = int(request.args.get('days', 30))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    
+    return jsonify({
+        'stats': corpus_stats.query(request.args.get('userId'), days=days),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/admission/stats')
+def admission_stats():
+    return jsonify({
+        'analyze': analysis_admission.stats(),
+        'upload': upload_admission.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/upload', methods=['POST'])
+@admission_required(upload_admission)
 def upload_resume():
     try:
         if 'file' not in request.files:
@@ -76,10 +208,11 @@ def upload_resume():
         stored_filename = f"{file_id}.{file_extension}"
         
         # Save file
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], stored_filename)
-        file.save(file_path)
+        file_path = upload_storage.path_for(file_id, stored_filename)
+        with upload_storage.tracking(user_id, file_path):
+            file.save(file_path)
         
-        # Create file metadata
+        # Create file metadata; the content hash lets byte-identical uploads reuse an earlier analysis
         file_metadata = {
             'file_id': file_id,
             'original_name': filename,
@@ -88,13 +221,17 @@ def upload_resume():
             'upload_date': datetime.now().isoformat(),
             'file_size': os.path.getsize(file_path),
             'file_type': file_extension,
+            'content_hash': file_digest(file_path),
             'status': 'uploaded'
         }
         
         # Save metadata
-        metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_metadata.json")
-        with open(metadata_path, 'w') as f:
-            json.dump(file_metadata, f, indent=2)
+        metadata_path = upload_storage.path_for(file_id, f"{file_id}_metadata.json")
+        with upload_storage.tracking(user_id, metadata_path):
+            result_cache.store_json(metadata_path, file_metadata)
+        
+        # Extract in the background while the user is idle, so the analyze call is mostly a cache lookup
+        pipeline.speculate(file_id)
         
         return jsonify({
             'message': 'File uploaded successfully',
@@ -105,38 +242,19 @@ def upload_resume():
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+def run_analysis(file_id):
+    """Analyze through the shared pipeline (so the blueprint routes reuse the extraction) and persist it"""
+    analysis_result = pipeline.reuse_exact(file_id)
+    if analysis_result is None:
+        analysis_result = pipeline.get_report(file_id)['analysis']
+    pipeline.save_analysis(file_id, analysis_result)
+    return analysis_result
+
 @app.route('/api/analyze/<file_id>', methods=['GET'])
+@admission_required(analysis_admission)
 def analyze_resume(file_id):
     try:
-        # Load file metadata
-        metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_metadata.json")
-        
-        if not os.path.exists(metadata_path):
-            return jsonify({'error': 'File not found'}), 404
-        
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
-        
-        # Get file path
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], metadata['stored_name'])
-        
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Resume file not found'}), 404
-        
-        # Analyze resume
-        analysis_result = analyzer.analyze_resume(file_path, metadata['file_type'])
-        
-        # Save analysis results
-        analysis_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_analysis.json")
-        with open(analysis_path, 'w') as f:
-            json.dump(analysis_result, f, indent=2)
-        
-        # Update metadata
-        metadata['status'] = 'analyzed'
-        metadata['analysis_date'] = datetime.now().isoformat()
-        
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        analysis_result = analysis_flights.do(file_id, run_analysis, file_id)
         
         return jsonify({
             'message': 'Analysis completed successfully',
@@ -144,23 +262,43 @@ def analyze_resume(file_id):
             'analysis': analysis_result
         }), 200
         
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/api/analyze/<file_id>/stream', methods=['GET'])
+@admission_required(analysis_admission)
+def analyze_resume_stream(file_id):
+    """Stream analysis progress as Server-Sent Events, sending partial results per stage"""
+    def events():
+        try:
+            for stage, payload in pipeline.iter_report(file_id):
+                if stage == 'complete':
+                    pipeline.save_analysis(file_id, payload['analysis'])
+                    payload = {'file_id': file_id, 'analysis': payload['analysis']}
+                yield format_sse(stage, payload)
+        except FileNotFoundError as e:
+            yield format_sse('error', {'error': str(e), 'status': 404})
+        except Exception as e:
+            yield format_sse('error', {'error': f'Analysis failed: {str(e)}', 'status': 500})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/results/<file_id>', methods=['GET'])
 def get_analysis_results(file_id):
     try:
-        analysis_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_analysis.json")
+        analysis_result = result_cache.load_json(upload_storage.artifact_path(file_id, 'analysis'))
         
-        if not os.path.exists(analysis_path):
+        if analysis_result is None:
             return jsonify({'error': 'Analysis results not found'}), 404
         
-        with open(analysis_path, 'r') as f:
-            analysis_result = json.load(f)
-        
         return jsonify({
             'file_id': file_id,
-            'analysis': analysis_result
+            'analysis': project_fields(analysis_result, parse_fields(request.args.get('fields')))
         }), 200
         
     except Exception as e:
@@ -178,6 +316,7 @@ def generate_resume():
         
         # Generate unique ID for this resume
         resume_id = str(uuid.uuid4())
+        user_id = data.get('userId', 'anonymous')
         
         # For now, we'll create a mock AI-generated resume
         # In a real implementation, you would integrate with an AI service like OpenAI
@@ -191,13 +330,14 @@ def generate_resume():
             'projects': data.get('projects', []),
             'certifications': data.get('certifications', []),
             'generated_at': datetime.now().isoformat(),
-            'template': 'professional'
+            'template': 'professional',
+            'user_id': user_id
         }
         
         # Save the generated resume
-        resume_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{resume_id}_generated_resume.json")
-        with open(resume_path, 'w') as f:
-            json.dump(generated_content, f, indent=2)
+        resume_path = upload_storage.path_for(resume_id, f"{resume_id}_generated_resume.json")
+        with upload_storage.tracking(user_id, resume_path):
+            result_cache.store_json(resume_path, generated_content, compress=True)
         
         return jsonify({
             'success': True,
@@ -213,16 +353,12 @@ def generate_resume():
 def download_generated_resume(resume_id):
     """Download the generated resume as PDF"""
     try:
-        resume_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{resume_id}_generated_resume.json")
+        resume_data = result_cache.load_json(upload_storage.artifact_path(resume_id, 'generated'))
         
-        if not os.path.exists(resume_path):
+        if resume_data is None:
             return jsonify({'error': 'Generated resume not found'}), 404
         
-        with open(resume_path, 'r') as f:
-            resume_data = json.load(f)
-        
-        # For now, return the JSON data
-        # In a real implementation, you would generate a PDF and return it
+        # The PDF itself is rendered on demand by /api/resume-pdf/<resume_id>
         return jsonify({
             'success': True,
             'resume_id': resume_id,
@@ -233,6 +369,34 @@ def download_generated_resume(resume_id):
     except Exception as e:
         return jsonify({'error': f'Failed to download resume: {str(e)}'}), 500
 
+@app.route('/api/resume-pdf/<resume_id>')
+def generated_resume_pdf(resume_id):
+    """Render the generated resume as a PDF, served from the render cache when possible"""
+    try:
+        resume_data = result_cache.load_json(upload_storage.artifact_path(resume_id, 'generated'))
+        
+        if resume_data is None:
+            return jsonify({'error': 'Generated resume not found'}), 404
+        
+        template = request.args.get('template') or resume_data.get('template') or DEFAULT_TEMPLATE
+        if template not in TEMPLATES:
+            return jsonify({'error': f'Unknown template. Available: {", ".join(TEMPLATES)}'}), 400
+        
+        render_key, pdf = pdf_renderer.render(resume_data, template)
+        
+        if request.if_none_match.contains(render_key):
+            return Response(status=304)
+        
+        response = Response(pdf, mimetype='application/pdf')
+        response.set_etag(render_key)
+        response.headers['Content-Disposition'] = f'attachment; filename="resume-{resume_id}.pdf"'
+        return response
+        
+    except FileNotFoundError:
+        return jsonify({'error': 'Generated resume not found'}), 404
+    except Exception as e:
+        return jsonify({'error': f'Failed to render resume PDF: {str(e)}'}), 500
+
 # Register blueprints
 app.register_blueprint(resume_bp, url_prefix='/api')
 
@@ -241,8 +405,16 @@ if __name__ == '__main__':
     print("Available endpoints:")
     print("  - POST /api/upload - Upload resume file")
     print("  - GET /api/analyze/<file_id> - Analyze uploaded resume")
+    print("  - GET /api/analyze/<file_id>/stream - Analysis progress as Server-Sent Events")
     print("  - GET /api/results/<file_id> - Get analysis results")
+    print("  - POST /api/resume/full-report - Combined structural, keyword and ATS report")
+    print("  - POST /api/resume/entities - Companies, job titles, dates and degrees (batched)")
     print("  - POST /api/generate-resume - Generate AI resume")
     print("  - GET /api/download-generated/<resume_id> - Download generated resume")
+    print("  - GET /api/resume-pdf/<resume_id> - Generated resume as PDF")
     print("  - GET /api/health - Health check")
+    print("  - GET /api/cache/stats - Results cache statistics")
+    print("  - GET /api/storage/usage - Per-user disk usage")
+    print("  - GET /api/admission/stats - Admission control state and rejections")
+    print("  - GET /api/stats - Corpus skill, score and section aggregates")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -2,6 +2,15 @@ from flask import Blueprint, request, jsonify
 from .services.resume_analyzer import ResumeAnalyzer
 from .services.ats_checker import ATSChecker
 from .services.keyword_extractor import KeywordExtractor
+from .services.entity_extractor import EntityExtractor
+from .services.analysis_pipeline import AnalysisPipeline
+from .services.result_cache import ResultCache
+from .services.compressed_storage import CompressedStore
+from .services.response_utils import parse_fields, project_fields
+from .services.upload_storage import UploadStorage, classify_name, ORIGINAL_ARTIFACT
+from .services.near_duplicates import DuplicateIndex
+from .services.corpus_stats import CorpusStats
+from .services.admission import AdmissionController, admission_required
 import os
 import json
 from datetime import datetime
@@ -12,31 +21,71 @@ resume_bp = Blueprint('resume', __name__)
 analyzer = ResumeAnalyzer()
 ats_checker = ATSChecker()
 keyword_extractor = KeywordExtractor()
+entity_extractor = EntityExtractor()
+duplicate_index = DuplicateIndex()
+compressed_store = CompressedStore()
+result_cache = ResultCache(store=compressed_store)
+upload_storage = UploadStorage()
+corpus_stats = CorpusStats(upload_storage, compressed_store)
+
+# Admission control for the CPU-heavy routes; limits can be overridden via app.config
+analysis_admission = AdmissionController('analyze', max_concurrent=4, max_queue=16, user_rate=1.0, user_burst=10)
+upload_admission = AdmissionController('upload', max_concurrent=8, max_queue=32, user_rate=0.5, user_burst=5)
+
+# Speculative extraction at upload time backs off while analyze requests hold the admission slots
+pipeline = AnalysisPipeline(analyzer, ats_checker, keyword_extractor, upload_storage, result_cache,
+                            entity_extractor=entity_extractor, duplicate_index=duplicate_index,
+                            corpus_stats=corpus_stats, admission=analysis_admission)
+
+# Upper bound on files per bulk entity extraction request
+MAX_ENTITY_BATCH = 100
+
+# Drop cached copies of anything the retention sweeper deletes
+upload_storage.on_delete(lambda file_id, path: result_cache.invalidate(path))
+upload_storage.on_delete(lambda file_id, path: pipeline.invalidate(file_id))
+
+def forget_duplicate(file_id, path):
+    """Drop a file from the duplicate index once its original or signature is swept"""
+    parsed = classify_name(os.path.basename(path))
+    if parsed and parsed['artifact'] in (ORIGINAL_ARTIFACT, 'signature'):
+        duplicate_index.remove(file_id)
+
+upload_storage.on_delete(forget_duplicate)
+
+def forget_analysis(file_id, path):
+    """Stop counting an analysis in the corpus stats once the sweeper deletes it"""
+    parsed = classify_name(os.path.basename(path))
+    if parsed and parsed['artifact'] == 'analysis':
+        corpus_stats.discard(file_id)
+
+upload_storage.on_delete(forget_analysis)
 
 @resume_bp.route('/resume/quick-analyze', methods=['POST'])
+@admission_required(analysis_admission)
 def quick_analyze():
-    """Quick analysis endpoint for demo purposes"""
+    """Fast provisional analysis of the first pages; the full analysis follows in the background"""
     try:
         data = request.get_json()
         
-        if not data or 'fileName' not in data:
-            return jsonify({'error': 'Missing file name'}), 400
-        
-        file_name = data['fileName']
+        if not data or not data.get('fileId'):
+            return jsonify({'error': 'File ID required'}), 400
         
-        # Simulate analysis based on file type and name
-        mock_analysis = generate_mock_analysis(file_name)
+        analysis = pipeline.quick_analysis(data['fileId'])
         
         return jsonify({
             'success': True,
-            'analysis': mock_analysis,
+            'provisional': analysis['provisional'],
+            'analysis': project_fields(analysis, parse_fields(request.args.get('fields'))),
             'timestamp': datetime.now().isoformat()
         }), 200
         
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'Quick analysis failed: {str(e)}'}), 500
 
 @resume_bp.route('/resume/detailed-analyze', methods=['POST'])
+@admission_required(analysis_admission)
 def detailed_analyze():
     """Detailed analysis with actual file processing"""
     try:
@@ -46,18 +95,21 @@ def detailed_analyze():
             return jsonify({'error': 'File ID required'}), 400
         
         # Process the actual file
-        analysis_result = analyzer.detailed_analysis(file_id)
+        report = pipeline.get_report(file_id)
         
         return jsonify({
             'success': True,
-            'analysis': analysis_result,
+            'analysis': project_fields(report['detailed'], parse_fields(request.args.get('fields'))),
             'timestamp': datetime.now().isoformat()
         }), 200
         
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'Detailed analysis failed: {str(e)}'}), 500
 
 @resume_bp.route('/resume/ats-check', methods=['POST'])
+@admission_required(analysis_admission)
 def ats_compatibility_check():
     """Check ATS compatibility of resume"""
     try:
@@ -67,18 +119,21 @@ def ats_compatibility_check():
         if not file_id:
             return jsonify({'error': 'File ID required'}), 400
         
-        ats_score = ats_checker.check_compatibility(file_id, job_description)
+        ats_score = pipeline.check_ats(file_id, job_description)
         
         return jsonify({
             'success': True,
-            'ats_score': ats_score,
+            'ats_score': project_fields(ats_score, parse_fields(request.args.get('fields'))),
             'timestamp': datetime.now().isoformat()
         }), 200
         
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'ATS check failed: {str(e)}'}), 500
 
 @resume_bp.route('/resume/keywords', methods=['POST'])
+@admission_required(analysis_admission)
 def extract_keywords():
     """Extract keywords from resume"""
     try:
@@ -87,83 +142,67 @@ def extract_keywords():
         if not file_id:
             return jsonify({'error': 'File ID required'}), 400
         
-        keywords = keyword_extractor.extract_keywords(file_id)
+        keywords = pipeline.get_report(file_id)['keywords']
         
         return jsonify({
             'success': True,
-            'keywords': keywords,
+            'keywords': project_fields(keywords, parse_fields(request.args.get('fields'))),
             'timestamp': datetime.now().isoformat()
         }), 200
         
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'Keyword extraction failed: {str(e)}'}), 500
 
-def generate_mock_analysis(file_name):
-    """Generate realistic mock analysis results"""
-    
-    # Base scores that vary slightly
-    base_scores = {
-        'pdf': {'overall': 82, 'ats': 88},
-        'doc': {'overall': 76, 'ats': 82},
-        'docx': {'overall': 79, 'ats': 85}
-    }
-    
-    file_ext = file_name.split('.')[-1].lower() if '.' in file_name else 'pdf'
-    scores = base_scores.get(file_ext, base_scores['pdf'])
-    
-    # Determine skill level from filename
-    tech_keywords = ['developer', 'engineer', 'programmer', 'analyst', 'architect']
-    is_tech = any(keyword in file_name.lower() for keyword in tech_keywords)
-    
-    if is_tech:
-        skills = ["JavaScript", "React", "Node.js", "Python", "SQL", "Git", "AWS", "Docker"]
-        strengths = [
-            "Strong technical skills section",
-            "Relevant programming experience",
-            "Clear project descriptions",
-            "Good use of technical keywords"
-        ]
-        improvements = [
-            "Add more quantifiable achievements",
-            "Include metrics for project impact",
-            "Expand on leadership experience",
-            "Add certifications section"
-        ]
-    else:
-        skills = ["Communication", "Project Management", "Leadership", "Analysis", "Strategy"]
-        strengths = [
-            "Strong communication skills",
-            "Relevant work experience",
-            "Clear formatting and structure",
-            "Good use of action verbs"
-        ]
-        improvements = [
-            "Add more quantifiable results",
-            "Include relevant industry keywords",
-            "Expand on achievements",
-            "Add skills section"
-        ]
-    
-    return {
-        'overallScore': scores['overall'],
-        'atsCompatibility': scores['ats'],
-        'strengths': strengths,
-        'improvements': improvements,
-        'keywords': skills,
-        'sections': {
-            'contact': {'score': 95, 'feedback': 'Complete contact information'},
-            'summary': {'score': 78, 'feedback': 'Good summary, could be more targeted'},
-            'experience': {'score': 85, 'feedback': 'Strong experience section'},
-            'education': {'score': 90, 'feedback': 'Well formatted education'},
-            'skills': {'score': 80, 'feedback': 'Good skills list, add more keywords'}
-        },
-        'recommendations': [
-            "Use more action verbs in experience descriptions",
-            "Add quantifiable metrics to achievements",
-            "Include relevant industry keywords",
-            "Optimize for ATS scanning"
-        ],
-        'readabilityScore': 82,
-        'keywordDensity': 'Optimal',
-        'formatScore': 88
-    }
+@resume_bp.route('/resume/full-report', methods=['POST'])
+@admission_required(analysis_admission)
+def full_report():
+    """Structural, keyword and ATS analysis from a single extraction"""
+    try:
+        file_id = request.json.get('fileId')
+        job_description = request.json.get('jobDescription', '')
+        
+        if not file_id:
+            return jsonify({'error': 'File ID required'}), 400
+        
+        report = dict(pipeline.get_report(file_id))
+        if job_description:
+            report['ats'] = pipeline.check_ats(file_id, job_description)
+        
+        return jsonify({
+            'success': True,
+            'report': project_fields(report, parse_fields(request.args.get('fields'))),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': f'Full report failed: {str(e)}'}), 500
+
+@resume_bp.route('/resume/entities', methods=['POST'])
+@admission_required(analysis_admission)
+def extract_entities():
+    """Companies, job titles, dates and degrees for one file or a batch of files"""
+    try:
+        file_ids = request.json.get('fileIds') or []
+        if request.json.get('fileId'):
+            file_ids = [request.json['fileId']] + list(file_ids)
+        
+        if not file_ids:
+            return jsonify({'error': 'File ID required'}), 400
+        
+        if len(file_ids) > MAX_ENTITY_BATCH:
+            return jsonify({'error': f'At most {MAX_ENTITY_BATCH} files per request'}), 400
+        
+        entities = pipeline.extract_entities(file_ids)
+        
+        return jsonify({
+            'success': True,
+            'entities': project_fields(entities, parse_fields(request.args.get('fields'))),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Entity extraction failed: {str(e)}'}), 500
@@ -0,0 +1,178 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Any, Optional
+
+from flask import request, jsonify
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status: int, retry_after: float, reason: str):
+        """Raised when a request is turned away; carries the HTTP status and Retry-After"""
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 5.0,
+                 user_rate: float = 1.0, user_burst: int = 10, max_tracked_users: int = 10000):
+        """Bound concurrent work with a bounded wait queue and per-user token-bucket quotas"""
+        self.name = name
+        self.queue_timeout = queue_timeout
+        self.max_tracked_users = max_tracked_users
+        self.configure(max_concurrent, max_queue, user_rate, user_burst)
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._active = 0
+        self._waiting = 0
+        self._service_time = 1.0  # moving average of seconds per admitted request
+
+        self.admitted = 0
+        self.rejections = {'quota': 0, 'queue_full': 0, 'queue_timeout': 0}
+
+    def configure(self, max_concurrent: int, max_queue: int, user_rate: float, user_burst: int) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def init_app(self, app) -> None:
+        """Read limits from app.config, e.g. ANALYZE_MAX_CONCURRENT for the 'analyze' controller"""
+        prefix = self.name.upper()
+        self.queue_timeout = app.config.get(f'{prefix}_QUEUE_TIMEOUT', self.queue_timeout)
+        self.configure(
+            app.config.get(f'{prefix}_MAX_CONCURRENT', self.max_concurrent),
+            app.config.get(f'{prefix}_MAX_QUEUE', self.max_queue),
+            app.config.get(f'{prefix}_USER_RATE', self.user_rate),
+            app.config.get(f'{prefix}_USER_BURST', self.user_burst)
+        )
+
+    def acquire(self, user_id: str) -> None:
+        """Admit a request or raise AdmissionRejected; every admitted request must release()"""
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+                while len(self._buckets) > self.max_tracked_users:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(user_id)
+
+            wait = bucket.take()
+            if wait:
+                self.rejections['quota'] += 1
+                raise AdmissionRejected(429, wait, 'Request quota exceeded for this user')
+
+            if self._slots.acquire(blocking=False):
+                self._active += 1
+                self.admitted += 1
+                return
+
+            if self._waiting >= self.max_queue:
+                self.rejections['queue_full'] += 1
+                raise AdmissionRejected(503, self._estimated_wait(), 'Server is busy, please retry')
+            self._waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self.rejections['queue_timeout'] += 1
+                raise AdmissionRejected(503, self._estimated_wait(), 'Server is busy, please retry')
+            self._active += 1
+            self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        with self._lock:
+            self._active -= 1
+            if service_time is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'active': self._active,
+                'waiting': self._waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'tracked_users': len(self._buckets),
+                'avg_service_seconds': round(self._service_time, 3),
+                'admitted': self.admitted,
+                'rejected': dict(self.rejections)
+            }
+
+    def _estimated_wait(self) -> float:
+        # Called with the lock held: the queue drains max_concurrent requests per service time
+        return self._service_time * (self._waiting + 1) / self.max_concurrent
+
+
+def caller_id() -> str:
+    """Best available identity for quotas: explicit userId, then the client address"""
+    user_id = request.headers.get('X-User-Id') or request.args.get('userId')
+    if not user_id and request.mimetype == 'multipart/form-data':
+        user_id = request.form.get('userId')
+    if not user_id and request.is_json:
+        user_id = (request.get_json(silent=True) or {}).get('userId')
+    return user_id or request.remote_addr or 'anonymous'
+
+
+def rejected_response(rejection: AdmissionRejected):
+    response = jsonify({'error': rejection.reason, 'retry_after': rejection.retry_after})
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+
+def admission_required(controller: AdmissionController):
+    """Route decorator that admits the request through a controller before running it"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                controller.acquire(caller_id())
+            except AdmissionRejected as rejection:
+                return rejected_response(rejection)
+
+            started = time.monotonic()
+            released = False
+            try:
+                response = view(*args, **kwargs)
+
+                # Streamed responses keep their slot until the stream is closed
+                streamed = getattr(response, 'is_streamed', False)
+                if streamed:
+                    released = True
+                    response.call_on_close(lambda: controller.release(time.monotonic() - started))
+                return response
+            finally:
+                if not released:
+                    controller.release(time.monotonic() - started)
+        return wrapper
+    return decorator
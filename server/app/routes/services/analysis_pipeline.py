@@ -0,0 +1,710 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .section_segmenter import segment, SegmentedDocument
+from .result_cache import ResultCache
+from .upload_storage import UploadStorage, artifact_name
+from .single_flight import SingleFlight, FlightAbandoned
+
+logger = logging.getLogger(__name__)
+
+# Quick tier limits: stop reading pages at this many characters or once the time budget is spent
+QUICK_CHAR_BUDGET = 6000
+QUICK_TIME_BUDGET = 0.05
+# Share of the time budget spent reading pages; the rest covers the analysis itself
+QUICK_READ_SHARE = 0.6
+# Full analyses queued behind quick-analyze calls; past this the full analysis is left to /api/analyze
+QUICK_MAX_SCHEDULED = 32
+
+# Speculative extraction of fresh uploads: most uploads kept waiting, how long one may wait
+# before it is dropped, and how often a deferred one re-checks the load
+SPECULATIVE_MAX_PENDING = 32
+SPECULATIVE_MAX_AGE = 120.0
+SPECULATIVE_BACKOFF = 0.5
+
+
+class AnalysisPipeline:
+    def __init__(self, analyzer, ats_checker, keyword_extractor, storage: UploadStorage,
+                 cache: Optional[ResultCache] = None, max_workers: int = 4, max_reports: int = 64,
+                 entity_extractor=None, duplicate_index=None, corpus_stats=None, admission=None):
+        """Share one text extraction per file across the structural, keyword, ATS and entity analyzers"""
+        self.analyzer = analyzer
+        self.ats_checker = ats_checker
+        self.keyword_extractor = keyword_extractor
+        self.entity_extractor = entity_extractor
+        self.duplicate_index = duplicate_index
+        self.corpus_stats = corpus_stats
+        self.admission = admission
+        self.storage = storage
+        self.cache = cache if cache is not None else ResultCache()
+        self.max_reports = max_reports
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        self.flights = SingleFlight()
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Quick-tier reads and scheduled full analyses get their own pools so neither waits behind the other
+        self.quick_char_budget = QUICK_CHAR_BUDGET
+        self.quick_time_budget = QUICK_TIME_BUDGET
+        self.quick_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='analysis-quick')
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analysis-background')
+        self.max_scheduled = QUICK_MAX_SCHEDULED
+        self._scheduled = set()
+        self._schedule_rejections = 0
+        self._persist_lock = threading.Lock()
+
+        # Uploads waiting for speculative extraction, oldest first, with the time they were queued
+        self.speculative = True
+        self.speculative_max_pending = SPECULATIVE_MAX_PENDING
+        self.speculative_max_age = SPECULATIVE_MAX_AGE
+        self._pending = OrderedDict()
+        self._speculation = threading.Condition()
+        self._speculator: Optional[threading.Thread] = None
+        self._speculation_counts = {
+            'queued': 0, 'completed': 0, 'hits': 0, 'skipped': 0, 'deferrals': 0,
+            'expired': 0, 'dropped': 0, 'cancelled': 0, 'failed': 0
+        }
+
+    def init_app(self, app) -> None:
+        """Read the quick-analyze budgets and speculative extraction settings from app.config"""
+        self.quick_char_budget = app.config.get('QUICK_ANALYZE_CHAR_BUDGET', self.quick_char_budget)
+        self.max_scheduled = app.config.get('QUICK_ANALYZE_MAX_SCHEDULED', self.max_scheduled)
+        budget_ms = app.config.get('QUICK_ANALYZE_BUDGET_MS')
+        if budget_ms is not None:
+            self.quick_time_budget = budget_ms / 1000
+        self.speculative = app.config.get('SPECULATIVE_EXTRACTION', self.speculative)
+        self.speculative_max_pending = app.config.get('SPECULATIVE_MAX_PENDING', self.speculative_max_pending)
+        self.speculative_max_age = app.config.get('SPECULATIVE_MAX_AGE', self.speculative_max_age)
+
+    def load_metadata(self, file_id: str) -> Dict[str, Any]:
+        """Load the metadata sidecar for an uploaded file"""
+        metadata = self.cache.load_json(self.storage.artifact_path(file_id, 'metadata'))
+
+        if metadata is None:
+            raise FileNotFoundError('File not found')
+
+        return metadata
+
+    def locate_file(self, file_id: str) -> Tuple[Dict[str, Any], str]:
+        """Metadata and stored path of an uploaded file"""
+        metadata = self.load_metadata(file_id)
+        file_path = self.storage.locate(file_id, metadata['stored_name'])
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError('Resume file not found')
+
+        return metadata, file_path
+
+    def load_document(self, file_id: str) -> Dict[str, Any]:
+        """Extract and segment the text of an uploaded file"""
+        metadata, file_path = self.locate_file(file_id)
+        text = self._stored_text(file_id, file_path)
+        if text is None:
+            text = self.analyzer.extract_text(file_path, metadata['file_type'])
+            self._store_text(file_id, metadata, text)
+
+        return {
+            'metadata': metadata,
+            'file_path': file_path,
+            'text': text,
+            'document': segment(text)
+        }
+
+    def _stored_text(self, file_id: str, file_path: str) -> Optional[str]:
+        """Previously extracted text, unless the original was replaced after it was written"""
+        path = self.storage.artifact_path(file_id, 'text')
+        text_mtime = self._file_mtime(path)
+        if text_mtime is None or text_mtime < (self._file_mtime(file_path) or 0):
+            return None
+        try:
+            return self.cache.store.read_text(path)
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _store_text(self, file_id: str, metadata: Dict[str, Any], text: str) -> None:
+        path = self.storage.path_for(file_id, artifact_name(file_id, 'text'))
+        with self.storage.tracking(metadata.get('user_id', 'anonymous'), path):
+            self.cache.store.write_text(path, text)
+
+    def build_report(self, file_id: str, text: str, file_type: str,
+                     document: Optional[SegmentedDocument] = None) -> Dict[str, Any]:
+        """Run every analyzer over one shared document"""
+        if document is None:
+            document = segment(text)
+
+        # The analyzers only read the shared document, so they can run side by side
+        analysis_future = self.executor.submit(self.analyzer.analyze_text, text, file_type, document)
+        keywords_future = self.executor.submit(self.keyword_extractor.extract_keywords, text)
+        ats_future = self.executor.submit(self.ats_checker.check_compatibility, text, "", document)
+        entities_future = self.executor.submit(self._extract_entities, text)
+        duplicates_future = self.executor.submit(self._flag_duplicates, file_id, text)
+
+        analysis = analysis_future.result()
+        duplicates = duplicates_future.result()
+        if duplicates is not None:
+            analysis['duplicates'] = duplicates
+
+        return self._assemble_report(file_id, file_type, analysis,
+                                     keywords_future.result(), ats_future.result(), entities_future.result())
+
+    def extract_entities(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Entities for many files, reusing cached reports and batching the rest through one nlp.pipe"""
+        results = {}
+        pending = {}
+
+        for file_id in file_ids:
+            entry = self._cached_entry(file_id)
+            if entry is not None and entry['report'].get('entities') is not None:
+                results[file_id] = entry['report']['entities']
+                continue
+            try:
+                pending[file_id] = entry['text'] if entry is not None else self.load_document(file_id)['text']
+            except Exception as e:
+                # One unreadable file should not fail the whole batch
+                results[file_id] = {'error': str(e)}
+
+        if pending and self.entity_extractor is not None:
+            extracted = self.entity_extractor.extract_batch(pending.values())
+            results.update(zip(pending.keys(), extracted))
+
+        return {file_id: results.get(file_id) for file_id in file_ids}
+
+    def iter_report(self, file_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Build a file's report stage by stage, yielding (stage, partial result) as each finishes"""
+        while True:
+            entry = self._cached_entry(file_id)
+            if entry is not None:
+                yield from self._replay(entry['report'])
+                return
+
+            # Join an analysis of the same file that is already running instead of repeating it
+            future, leader = self.flights.begin(file_id)
+            if leader:
+                break
+            try:
+                future.result()
+            except FlightAbandoned:
+                continue
+            entry = self._cached_entry(file_id)
+            if entry is not None:
+                yield from self._replay(entry['report'])
+                return
+
+        try:
+            metadata, file_path = self.locate_file(file_id)
+            file_type = metadata['file_type']
+
+            pages = []
+            for index, total, page_text in self.analyzer.iter_pages(file_path, file_type):
+                pages.append(page_text)
+                yield 'pages', {'page': index + 1, 'total': total}
+            text = "".join(pages)
+            document = segment(text)
+
+            keywords = self.keyword_extractor.extract_keywords(text)
+            yield 'keywords', keywords
+
+            structure = self.analyzer.analyze_structure(text, document)
+            yield 'structure', {
+                'sections': structure['sections_present'],
+                'word_count': structure['word_count'],
+                'bullet_points': structure['bullet_points'],
+                'has_metrics': structure['has_quantifiable_achievements'],
+                'segments': structure['segments']
+            }
+
+            entities = self._extract_entities(text)
+            if entities is not None:
+                yield 'entities', entities
+
+            duplicates = self._flag_duplicates(file_id, text)
+            if duplicates is not None:
+                yield 'duplicates', duplicates
+
+            analysis = self.analyzer.analyze_text(text, file_type, document)
+            if duplicates is not None:
+                analysis['duplicates'] = duplicates
+            ats = self.ats_checker.check_compatibility(text, "", document)
+            yield 'scores', self._scores(analysis, ats)
+
+            report = self._assemble_report(file_id, file_type, analysis, keywords, ats, entities)
+            entry = self._store_entry(file_id, file_path, text, document, report)
+        except Exception as e:
+            self.flights.finish(file_id, future, error=e)
+            raise
+        except BaseException:
+            # The client went away mid-stream; let waiters compute the report themselves
+            self.flights.finish(file_id, future, error=FlightAbandoned(file_id))
+            raise
+
+        self.flights.finish(file_id, future, result=entry)
+        yield 'complete', report
+
+    def _replay(self, report: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        yield 'pages', {'page': 1, 'total': 1, 'cached': True}
+        yield 'keywords', report['keywords']
+        yield 'structure', report['analysis']['structure']
+        if report.get('entities') is not None:
+            yield 'entities', report['entities']
+        if report['analysis'].get('duplicates') is not None:
+            yield 'duplicates', report['analysis']['duplicates']
+        yield 'scores', self._scores(report['analysis'], report['ats'])
+        yield 'complete', report
+
+    def _flag_duplicates(self, file_id: str, text: str) -> Optional[Dict[str, Any]]:
+        """Index a file's MinHash signature and report the duplicates already in the corpus"""
+        if self.duplicate_index is None:
+            return None
+
+        metadata = self.load_metadata(file_id)
+        content_hash = metadata.get('content_hash')
+        # None for texts without words; those are only compared by content hash
+        signature = self.duplicate_index.signature(text)
+        near = self.duplicate_index.query(signature, exclude=file_id)
+        exact = self.duplicate_index.exact_matches(content_hash, exclude=file_id)
+
+        self.duplicate_index.add(file_id, signature, content_hash, metadata.get('user_id'))
+        self._store_signature(file_id, metadata, signature)
+
+        return self._visible_duplicates(metadata.get('user_id'), exact, near)
+
+    def _visible_duplicates(self, user_id: Optional[str], exact: List[str],
+                            near: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Duplicate flags as the uploader may see them: file ids only for their own files
+
+        File ids are the only access control, so matches owned by anyone else
+        (including every anonymous upload) are reported as counts and scores.
+        """
+        def own(file_id: str) -> bool:
+            return user_id not in (None, 'anonymous') and self.duplicate_index.owner_of(file_id) == user_id
+
+        return {
+            'is_duplicate': bool(near or exact),
+            'exact_duplicates': [twin for twin in exact if own(twin)],
+            'near_duplicates': [match for match in near if own(match['file_id'])],
+            'other_users': {
+                'exact_duplicates': sum(1 for twin in exact if not own(twin)),
+                'near_similarities': [match['similarity'] for match in near if not own(match['file_id'])]
+            }
+        }
+
+    def _store_signature(self, file_id: str, metadata: Dict[str, Any], signature) -> None:
+        path = self.storage.path_for(file_id, artifact_name(file_id, 'signature'))
+        with self.storage.tracking(metadata.get('user_id', 'anonymous'), path):
+            self.cache.store_json(path, {
+                'file_id': file_id,
+                'user_id': metadata.get('user_id'),
+                'content_hash': metadata.get('content_hash'),
+                'signature': signature.tolist() if signature is not None else None
+            })
+
+    def reuse_exact(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Analysis of a byte-identical file that was already analyzed, without extracting this one"""
+        entry = self._reuse_entry(file_id)
+        if entry is not None:
+            return entry['report']['analysis']
+        if self.duplicate_index is None:
+            return None
+
+        metadata = self.load_metadata(file_id)
+        twins = self.duplicate_index.exact_matches(metadata.get('content_hash'), exclude=file_id)
+        for twin in twins:
+            try:
+                twin_metadata = self.load_metadata(twin)
+            except FileNotFoundError:
+                continue
+            if twin_metadata.get('status') != 'analyzed':
+                continue
+            stored = self.cache.load_json(self.storage.artifact_path(twin, 'analysis'))
+            if stored is not None:
+                return self._reused_analysis(file_id, metadata, stored, twin, twins)
+
+        return None
+
+    def _reuse_entry(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Report entry copied from a byte-identical file whose full report is still in memory"""
+        if self.duplicate_index is None:
+            return None
+
+        metadata, file_path = self.locate_file(file_id)
+        twins = self.duplicate_index.exact_matches(metadata.get('content_hash'), exclude=file_id)
+        for twin in twins:
+            entry = self._cached_entry(twin)
+            if entry is None:
+                continue
+            report = dict(entry['report'], file_id=file_id, generated_at=datetime.now().isoformat())
+            report['analysis'] = self._reused_analysis(file_id, metadata, report['analysis'], twin, twins)
+            return self._store_entry(file_id, file_path, entry['text'], entry['document'], report)
+
+        return None
+
+    def _reused_analysis(self, file_id: str, metadata: Dict[str, Any], analysis: Dict[str, Any],
+                         twin: str, twins: List[str]) -> Dict[str, Any]:
+        signature = self.duplicate_index.signature_of(twin)
+        self.duplicate_index.add(file_id, signature, metadata.get('content_hash'), metadata.get('user_id'))
+        self._store_signature(file_id, metadata, signature)
+
+        duplicates = self._visible_duplicates(metadata.get('user_id'), twins, [])
+        duplicates['reused'] = True
+        # Reusing another user's analysis stays internal; only the uploader's own file is named
+        if twin in duplicates['exact_duplicates']:
+            duplicates['reused_from'] = twin
+        return dict(analysis, duplicates=duplicates)
+
+    def _extract_entities(self, text: str) -> Optional[Dict[str, Any]]:
+        if self.entity_extractor is None:
+            return None
+        return self.entity_extractor.extract(text)
+
+    def _assemble_report(self, file_id: str, file_type: str, analysis: Dict[str, Any],
+                         keywords: Dict[str, Any], ats: Dict[str, Any],
+                         entities: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
+            'file_id': file_id,
+            'file_type': file_type,
+            'analysis': analysis,
+            'detailed': self.analyzer.detailed_analysis(analysis, keywords),
+            'keywords': keywords,
+            'ats': ats,
+            'entities': entities,
+            'generated_at': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _scores(analysis: Dict[str, Any], ats: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'overall_score': analysis['overall_score'],
+            'ats_compatibility': analysis['ats_compatibility'],
+            'section_scores': analysis['section_scores'],
+            'readability_score': analysis['readability']['score'],
+            'overall_ats_score': ats['overall_ats_score']
+        }
+
+    def get_report(self, file_id: str) -> Dict[str, Any]:
+        """Return the combined report for a file, extracting its text at most once"""
+        entry = self._get_entry(file_id)
+        return entry['report']
+
+    def check_ats(self, file_id: str, job_description: str = "") -> Dict[str, Any]:
+        """ATS check against a job description, reusing the cached document"""
+        entry = self._get_entry(file_id)
+
+        if not job_description:
+            return entry['report']['ats']
+
+        return self.ats_checker.check_compatibility(entry['text'], job_description, entry['document'])
+
+    def quick_analysis(self, file_id: str) -> Dict[str, Any]:
+        """Cheap structural and keyword analysis of the first pages within the time budget
+
+        The result is provisional: only the 'keywords' and 'structure' fields of
+        a full analysis, with no scores or readability. The full analysis is
+        scheduled in the background and replaces it, both here and in the stored
+        results, once it finishes. When not even the first page is read within
+        the budget there is no text to analyze, and the result carries only
+        'provisional', 'pending' and 'file_type'.
+        """
+        started = time.monotonic()
+        deadline = started + self.quick_time_budget * QUICK_READ_SHARE
+
+        entry = self._cached_entry(file_id)
+        if entry is not None:
+            return dict(entry['report']['analysis'], provisional=False)
+
+        metadata, file_path = self.locate_file(file_id)
+        if metadata.get('status') == 'analyzed':
+            stored = self.cache.load_json(self.storage.artifact_path(file_id, 'analysis'))
+            if stored is not None:
+                return dict(stored, provisional=False)
+
+        file_type = metadata['file_type']
+        future = self.quick_executor.submit(self._read_prefix, file_path, file_type, deadline)
+        try:
+            text, pages_read, total_pages = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeout:
+            # Not even the first page fit in the budget; fall through to the full analysis
+            return {'provisional': True, 'pending': self.schedule(file_id), 'file_type': file_type}
+
+        keywords = self.analyzer.analyze_keywords(text)
+        structure = self.analyzer.analyze_structure(text)
+        analysis = {
+            'keywords': {
+                'technical': keywords['technical_keywords'],
+                'soft_skills': keywords['soft_skills'],
+                'action_verbs': keywords['action_verbs'],
+                'total_count': keywords['keyword_count']
+            },
+            'structure': {
+                'sections': structure['sections_present'],
+                'word_count': structure['word_count'],
+                'bullet_points': structure['bullet_points'],
+                'has_metrics': structure['has_quantifiable_achievements'],
+                'segments': structure['segments']
+            },
+            'analysis_date': datetime.now().isoformat(),
+            'file_type': file_type,
+            'provisional': True,
+            'pages_read': pages_read,
+            'total_pages': total_pages,
+            'truncated': pages_read < total_pages or len(text) >= self.quick_char_budget,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+
+        # Scheduled last so the full analysis does not compete with this request for the GIL;
+        # the background worker also persists the provisional result, off the request path
+        return dict(analysis, pending=self.schedule(file_id, provisional=analysis))
+
+    def _read_prefix(self, file_path: str, file_type: str, deadline: float) -> Tuple[str, int, int]:
+        pages = []
+        length = 0
+        pages_read = total_pages = 0
+
+        page_iter = self.analyzer.iter_pages(file_path, file_type)
+        try:
+            for index, total_pages, page_text in page_iter:
+                pages.append(page_text)
+                length += len(page_text)
+                pages_read = index + 1
+                if length >= self.quick_char_budget or time.monotonic() >= deadline:
+                    break
+        finally:
+            page_iter.close()
+
+        return "".join(pages)[:self.quick_char_budget], pages_read, total_pages
+
+    def schedule(self, file_id: str, provisional: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a full analysis in the background and persist it when done
+
+        A provisional analysis, if given, is saved by the worker before it
+        starts the full one. Returns whether one is queued for the file; when
+        max_scheduled are already waiting the file is not queued and the
+        caller's next /api/analyze request does the full analysis instead.
+        """
+        with self._lock:
+            if file_id in self._scheduled:
+                return True
+            if len(self._scheduled) >= self.max_scheduled:
+                self._schedule_rejections += 1
+                return False
+            self._scheduled.add(file_id)
+
+        self.background.submit(self._run_scheduled, file_id, provisional)
+        return True
+
+    def schedule_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'scheduled': len(self._scheduled), 'max_scheduled': self.max_scheduled,
+                    'rejected': self._schedule_rejections}
+
+    def _run_scheduled(self, file_id: str, provisional: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            if provisional is not None:
+                self.save_analysis(file_id, provisional, provisional=True)
+            report = self.get_report(file_id)
+            self.save_analysis(file_id, report['analysis'])
+        except Exception:
+            logger.exception('Background analysis of %s failed', file_id)
+        finally:
+            with self._lock:
+                self._scheduled.discard(file_id)
+
+    def speculate(self, file_id: str) -> bool:
+        """Queue a fresh upload for extraction ahead of its analyze call; never blocks the caller
+
+        The report lands in the in-memory cache and the extracted text on disk,
+        so the later analyze call is mostly a lookup. Nothing is persisted as
+        an analysis, since the user has not asked for one yet.
+        """
+        if not self.speculative:
+            return False
+
+        with self._speculation:
+            if file_id in self._pending:
+                return False
+            self._pending[file_id] = time.monotonic()
+            self._speculation_counts['queued'] += 1
+            # Past the bound the oldest upload is the least likely to still be waiting for an analyze call
+            while len(self._pending) > self.speculative_max_pending:
+                self._pending.popitem(last=False)
+                self._speculation_counts['dropped'] += 1
+
+            if self._speculator is None or not self._speculator.is_alive():
+                self._speculator = threading.Thread(target=self._speculation_loop,
+                                                    name='analysis-speculative', daemon=True)
+                self._speculator.start()
+            self._speculation.notify()
+        return True
+
+    def speculation_stats(self) -> Dict[str, Any]:
+        with self._speculation:
+            return dict(self._speculation_counts, enabled=self.speculative, pending=len(self._pending))
+
+    def _speculation_loop(self) -> None:
+        while True:
+            with self._speculation:
+                self._expire_speculation()
+                while not self._pending:
+                    self._speculation.wait()
+                    self._expire_speculation()
+
+                if self._busy():
+                    # Real requests first: wait and re-check rather than compete with them
+                    self._speculation_counts['deferrals'] += 1
+                    self._speculation.wait(SPECULATIVE_BACKOFF)
+                    continue
+
+                # Newest upload first, it is the one most likely to be analyzed next
+                file_id, _ = self._pending.popitem(last=True)
+
+            self._run_speculative(file_id)
+
+    def _expire_speculation(self) -> None:
+        # Called with the speculation lock held
+        cutoff = time.monotonic() - self.speculative_max_age
+        while self._pending:
+            file_id, queued_at = next(iter(self._pending.items()))
+            if queued_at > cutoff:
+                break
+            del self._pending[file_id]
+            self._speculation_counts['expired'] += 1
+
+    def _busy(self) -> bool:
+        """Whether user-requested work is waiting or using at least half of the analyze capacity"""
+        with self._lock:
+            if self._scheduled:
+                return True
+        if self.admission is None:
+            return False
+        stats = self.admission.stats()
+        return stats['waiting'] > 0 or stats['active'] >= max(1, stats['max_concurrent'] // 2)
+
+    def _run_speculative(self, file_id: str) -> None:
+        outcome = 'completed'
+        try:
+            # Already extracted, or a byte-identical upload will reuse its twin's analysis
+            if self._cached_entry(file_id) is not None or self.reuse_exact(file_id) is not None:
+                outcome = 'skipped'
+            else:
+                entry = self._get_entry(file_id, speculative=True)
+                entry['speculative'] = True
+        except FileNotFoundError:
+            outcome = 'cancelled'
+        except Exception:
+            outcome = 'failed'
+            logger.exception('Speculative extraction of %s failed', file_id)
+
+        with self._speculation:
+            self._speculation_counts[outcome] += 1
+
+    def _cancel_speculation(self, file_id: str) -> None:
+        """A real request got there first; it does the extraction itself"""
+        with self._speculation:
+            if self._pending.pop(file_id, None) is not None:
+                self._speculation_counts['cancelled'] += 1
+
+    def save_analysis(self, file_id: str, analysis: Dict[str, Any], provisional: bool = False) -> bool:
+        """Persist an analysis and update the upload status; a provisional one never replaces a full one"""
+        with self._persist_lock:
+            # Copy, since the cached metadata dict is shared between requests
+            metadata = dict(self.load_metadata(file_id))
+            if provisional and metadata.get('status') == 'analyzed':
+                return False
+            user_id = metadata.get('user_id', 'anonymous')
+
+            analysis_path = self.storage.path_for(file_id, f"{file_id}_analysis.json")
+            with self.storage.tracking(user_id, analysis_path):
+                self.cache.store_json(analysis_path, analysis, compress=True)
+
+            metadata['status'] = 'provisional' if provisional else 'analyzed'
+            metadata['analysis_date'] = datetime.now().isoformat()
+
+            metadata_path = self.storage.path_for(file_id, f"{file_id}_metadata.json")
+            with self.storage.tracking(user_id, metadata_path):
+                self.cache.store_json(metadata_path, metadata)
+
+            # In memory only; the stats snapshot is written on its own timer. A re-analysis
+            # replaces the file's counted result instead of adding a second one
+            if self.corpus_stats is not None and not provisional:
+                self.corpus_stats.record(file_id, user_id, analysis)
+        return True
+
+    def invalidate(self, file_id: str) -> None:
+        """Drop the cached report so the next request re-extracts the file"""
+        with self._lock:
+            self._reports.pop(file_id, None)
+
+    def _cached_entry(self, file_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._reports.get(file_id)
+            if entry is not None:
+                self._reports.move_to_end(file_id)
+
+        # A re-upload under the same id changes the stored file, so check its mtime
+        if entry is not None and self._file_mtime(entry['file_path']) == entry['mtime']:
+            return entry
+        return None
+
+    def _get_entry(self, file_id: str, speculative: bool = False) -> Dict[str, Any]:
+        entry = self._cached_entry(file_id)
+        if entry is not None:
+            if not speculative and entry.pop('speculative', False):
+                with self._speculation:
+                    self._speculation_counts['hits'] += 1
+            return entry
+
+        if not speculative:
+            self._cancel_speculation(file_id)
+
+        # Concurrent requests for the same file wait on one extraction and share its result
+        while True:
+            try:
+                return self.flights.do(file_id, self._build_entry, file_id)
+            except FlightAbandoned:
+                continue
+
+    def _build_entry(self, file_id: str) -> Dict[str, Any]:
+        # Another flight may have finished between the cache check and joining this one
+        entry = self._cached_entry(file_id)
+        if entry is not None:
+            return entry
+
+        # A byte-identical upload whose report is in memory needs no extraction at all
+        entry = self._reuse_entry(file_id)
+        if entry is not None:
+            return entry
+
+        loaded = self.load_document(file_id)
+        report = self.build_report(file_id, loaded['text'], loaded['metadata']['file_type'], loaded['document'])
+        return self._store_entry(file_id, loaded['file_path'], loaded['text'], loaded['document'], report)
+
+    def _store_entry(self, file_id: str, file_path: str, text: str,
+                     document: SegmentedDocument, report: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {
+            'file_path': file_path,
+            'mtime': self._file_mtime(file_path),
+            'text': text,
+            'document': document,
+            'report': report
+        }
+
+        with self._lock:
+            self._reports[file_id] = entry
+            self._reports.move_to_end(file_id)
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+
+        return entry
+
+    @staticmethod
+    def _file_mtime(file_path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(file_path)
+        except OSError:
+            return None
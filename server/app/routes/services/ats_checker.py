@@ -1,6 +1,8 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import re
 from collections import Counter
+from .section_segmenter import segment, SegmentedDocument
+from .tokenizer import TermMatcher, shared_tokens
 
 class ATSChecker:
     def __init__(self):
@@ -31,8 +33,7 @@ class ATSChecker:
             # Extract keywords from job description
             job_keywords = self.extract_job_keywords(job_description)
         
-        text_lower = text.lower()
-        found_keywords = [kw for kw in job_keywords if kw in text_lower]
+        found_keywords = TermMatcher(job_keywords).find(shared_tokens(text))
         
         keyword_score = (len(found_keywords) / len(job_keywords)) * 100 if job_keywords else 0
         
@@ -52,16 +53,18 @@ class ATSChecker:
             'project management', 'communication', 'teamwork'
         ]
         
-        job_desc_lower = job_description.lower()
-        found_keywords = [kw for kw in common_keywords if kw in job_desc_lower]
+        found_keywords = TermMatcher(common_keywords).find(shared_tokens(job_description))
         
         return found_keywords
 
-    def check_formatting(self, text: str) -> Dict[str, Any]:
+    def check_formatting(self, text: str, document: Optional[SegmentedDocument] = None) -> Dict[str, Any]:
         """Check ATS-friendly formatting"""
         formatting_score = 100
         issues = []
         
+        if document is None:
+            document = segment(text)
+        
         # Check for special characters that might cause issues
         special_chars = re.findall(r'[^\w\s\-\.\,\:\;\(\)\[\]]', text)
         if len(special_chars) > 10:
@@ -69,8 +72,7 @@ class ATSChecker:
             issues.append("Too many special characters detected")
         
         # Check for proper section headers
-        section_headers = re.findall(r'^[A-Z\s]{3,}$', text, re.MULTILINE)
-        if len(section_headers) < 3:
+        if document.header_count < 3:
             formatting_score -= 15
             issues.append("Missing clear section headers")
         
@@ -141,35 +143,12 @@ class ATSChecker:
             'structure_issues': structure_issues
         }
 
-    def check_compatibility(self, file_id: str, job_description: str = "") -> Dict[str, Any]:
+    def check_compatibility(self, text: str, job_description: str = "",
+                            document: Optional[SegmentedDocument] = None) -> Dict[str, Any]:
         """Main ATS compatibility check function"""
-        # For demo purposes, return mock data
-        # In real implementation, this would load and analyze the actual file
-        
-        mock_text = """
-        John Doe
-        john.doe@email.com
-        (555) 123-4567
-        
-        PROFESSIONAL SUMMARY
-        Experienced software developer with 5+ years in web development.
-        
-        EXPERIENCE
-        Senior Developer - Tech Company (2020-2023)
-        • Developed web applications using React and Node.js
-        • Led team of 3 developers
-        • Improved application performance by 40%
-        
-        EDUCATION
-        Bachelor of Computer Science - University XYZ
-        
-        SKILLS
-        Python, JavaScript, React, Node.js, SQL, Git
-        """
-        
-        keyword_analysis = self.check_keyword_optimization(mock_text, job_description)
-        formatting_analysis = self.check_formatting(mock_text)
-        structure_analysis = self.check_length_and_structure(mock_text)
+        keyword_analysis = self.check_keyword_optimization(text, job_description)
+        formatting_analysis = self.check_formatting(text, document)
+        structure_analysis = self.check_length_and_structure(text)
         
         # Calculate overall ATS score
         overall_score = (
@@ -0,0 +1,152 @@
+import io
+import os
+import gzip
+import mmap
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, BinaryIO, Iterator
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+DEFAULT_LEVEL = 6
+# Below this many bytes the gzip header and trailer cost more than compression saves
+DEFAULT_MIN_BYTES = 512
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def open_artifact(path: str) -> BinaryIO:
+    """Open a stored file for reading, decompressing on the fly when it was written compressed
+
+    Detection is by magic bytes rather than filename, so files written before
+    compression was enabled stay readable under the same names.
+    """
+    f = open(path, 'rb')
+    try:
+        magic = f.read(len(GZIP_MAGIC))
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+    if magic == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=f, mode='rb')
+    return f
+
+
+@contextmanager
+def mapped_original(path: str):
+    """Read-only memory map of an uploaded original, so parsers seek into the page cache instead of loading it"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped; hand back the (empty) file itself
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+class CompressedStore:
+    def __init__(self, level: int = DEFAULT_LEVEL, min_bytes: int = DEFAULT_MIN_BYTES):
+        """Atomic, optionally gzip-compressed artifact writes with transparent streaming reads"""
+        self.level = level
+        self.min_bytes = min_bytes
+
+        self._lock = threading.Lock()
+        self._written = {'files': 0, 'logical_bytes': 0, 'stored_bytes': 0, 'seconds': 0.0}
+        self._read = {'files': 0, 'logical_bytes': 0, 'stored_bytes': 0, 'seconds': 0.0}
+
+    def init_app(self, app) -> None:
+        """Read STORAGE_COMPRESSION_LEVEL (0 disables compression) and STORAGE_COMPRESS_MIN_BYTES"""
+        self.level = app.config.get('STORAGE_COMPRESSION_LEVEL', self.level)
+        self.min_bytes = app.config.get('STORAGE_COMPRESS_MIN_BYTES', self.min_bytes)
+
+    def write(self, path: str, payload: bytes, compress: bool = True) -> int:
+        """Write beside the target and rename over it, so readers never see a torn file; returns stored bytes"""
+        started = time.perf_counter()
+        compress = compress and self.level > 0 and len(payload) >= self.min_bytes
+
+        directory, name = os.path.split(path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if compress:
+                    # mtime=0 keeps the output deterministic for identical payloads
+                    with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.level, mtime=0) as stream:
+                        stream.write(payload)
+                else:
+                    f.write(payload)
+                stored = f.tell()
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self._count(self._written, len(payload), stored, time.perf_counter() - started)
+        return stored
+
+    def read(self, path: str) -> bytes:
+        """Whole decompressed content of a stored file; raises FileNotFoundError if it does not exist"""
+        started = time.perf_counter()
+        with open_artifact(path) as f:
+            payload = f.read()
+        self._count(self._read, len(payload), self._stored_size(path), time.perf_counter() - started)
+        return payload
+
+    def write_text(self, path: str, text: str, compress: bool = True) -> int:
+        return self.write(path, text.encode('utf-8'), compress)
+
+    def iter_text(self, path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+        """Decompress and decode a stored text in chunks, without holding the compressed file in memory"""
+        started = time.perf_counter()
+        logical = 0
+        with open_artifact(path) as f:
+            reader = io.TextIOWrapper(f, encoding='utf-8')
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    break
+                logical += len(chunk)
+                yield chunk
+        self._count(self._read, logical, self._stored_size(path), time.perf_counter() - started)
+
+    def read_text(self, path: str) -> str:
+        return ''.join(self.iter_text(path))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            written, read = dict(self._written), dict(self._read)
+
+        return {
+            'level': self.level,
+            'min_bytes': self.min_bytes,
+            'compression_ratio': round(written['logical_bytes'] / written['stored_bytes'], 2)
+            if written['stored_bytes'] else None,
+            'write': self._throughput(written),
+            'read': self._throughput(read)
+        }
+
+    def _count(self, totals: Dict[str, Any], logical: int, stored: int, seconds: float) -> None:
+        with self._lock:
+            totals['files'] += 1
+            totals['logical_bytes'] += logical
+            totals['stored_bytes'] += stored
+            totals['seconds'] += seconds
+
+    @staticmethod
+    def _throughput(totals: Dict[str, Any]) -> Dict[str, Any]:
+        # Throughput is over uncompressed bytes, i.e. what callers actually get
+        seconds = totals['seconds']
+        return dict(totals, seconds=round(seconds, 4),
+                    mb_per_second=round(totals['logical_bytes'] / seconds / 1e6, 2) if seconds else None)
+
+    @staticmethod
+    def _stored_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
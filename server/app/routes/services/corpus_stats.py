@@ -0,0 +1,430 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot writes are then only serialized within one process
+    fcntl = None
+
+
+# Fixed-width score buckets: 0-9, 10-19, ..., 90-100
+SCORE_BUCKETS = 10
+SCORE_FIELDS = ['overall_score', 'ats_compatibility', 'readability_score']
+DEFAULT_TIMELINE_DAYS = 30
+TOP_SKILLS = 25
+# Seconds between snapshot writes; records in between only touch memory
+DEFAULT_SAVE_INTERVAL = 5.0
+
+# (user_id, summary) counted for one file
+Contribution = Tuple[str, Dict[str, Any]]
+
+
+def summarize(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a stored analysis the aggregates count"""
+    keywords = analysis.get('keywords', {})
+    sections = analysis.get('structure', {}).get('sections', {})
+    return {
+        'skills': sorted(set(keywords.get('technical', [])) | set(keywords.get('soft_skills', []))),
+        'sections': sorted(name for name, present in sections.items() if present),
+        'scores': {
+            'overall_score': analysis.get('overall_score'),
+            'ats_compatibility': analysis.get('ats_compatibility'),
+            'readability_score': analysis.get('readability', {}).get('score')
+        },
+        'day': (analysis.get('analysis_date') or datetime.now().isoformat())[:10]
+    }
+
+
+def bucket_of(score: float) -> int:
+    return min(max(int(score) // (100 // SCORE_BUCKETS), 0), SCORE_BUCKETS - 1)
+
+
+class Aggregate:
+    def __init__(self):
+        """Counters and fixed-bucket histograms over a set of analyses"""
+        self.analyses = 0
+        self.skills = Counter()
+        self.sections = Counter()
+        self.histograms = {field: [0] * SCORE_BUCKETS for field in SCORE_FIELDS}
+        self.score_sums = {field: 0.0 for field in SCORE_FIELDS}
+        self.score_counts = {field: 0 for field in SCORE_FIELDS}
+
+    def apply(self, summary: Dict[str, Any], sign: int = 1) -> None:
+        """Add a summary, or remove one that was added before with sign=-1"""
+        self.analyses += sign
+        for skill in summary['skills']:
+            self.skills[skill] += sign
+        for section in summary['sections']:
+            self.sections[section] += sign
+        for field, score in summary['scores'].items():
+            if field not in self.histograms or score is None:
+                continue
+            self.histograms[field][bucket_of(score)] += sign
+            self.score_sums[field] += sign * score
+            self.score_counts[field] += sign
+        # Keep removed keys from piling up in the snapshot
+        self.skills += Counter()
+        self.sections += Counter()
+
+    def to_dict(self, top_skills: Optional[int] = TOP_SKILLS) -> Dict[str, Any]:
+        return {
+            'analyses': self.analyses,
+            'skills': dict(self.skills.most_common(top_skills)),
+            'section_coverage': {
+                section: round(count / self.analyses, 3) if self.analyses else 0.0
+                for section, count in sorted(self.sections.items())
+            },
+            'score_histograms': {
+                field: {
+                    'bucket_width': 100 // SCORE_BUCKETS,
+                    'counts': list(counts),
+                    'mean': round(self.score_sums[field] / self.score_counts[field], 1)
+                    if self.score_counts[field] else None
+                }
+                for field, counts in self.histograms.items()
+            }
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'analyses': self.analyses,
+            'skills': dict(self.skills),
+            'sections': dict(self.sections),
+            'histograms': {field: list(counts) for field, counts in self.histograms.items()},
+            'score_sums': dict(self.score_sums),
+            'score_counts': dict(self.score_counts)
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'Aggregate':
+        aggregate = cls()
+        aggregate.analyses = data.get('analyses', 0)
+        aggregate.skills = Counter(data.get('skills', {}))
+        aggregate.sections = Counter(data.get('sections', {}))
+        for field in SCORE_FIELDS:
+            counts = data.get('histograms', {}).get(field)
+            if counts and len(counts) == SCORE_BUCKETS:
+                aggregate.histograms[field] = list(counts)
+            aggregate.score_sums[field] = data.get('score_sums', {}).get(field, 0.0)
+            aggregate.score_counts[field] = data.get('score_counts', {}).get(field, 0)
+        return aggregate
+
+
+class CorpusStats:
+    def __init__(self, storage=None, store=None, path: Optional[str] = None,
+                 save_interval: float = DEFAULT_SAVE_INTERVAL):
+        """Corpus-wide, per-user and per-day aggregates, updated as each analysis is saved
+
+        Queries read the materialized aggregates and never touch the stored
+        analyses; rebuild() recomputes everything from them through the
+        CompressedStore, bypassing the results cache. The snapshot also keeps
+        what was counted for each file, so processes sharing it merge their
+        changes into it instead of recounting.
+        """
+        self.storage = storage
+        self.store = store
+        self.path = path
+        self.save_interval = save_interval
+        self.loaded = False
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._reset()
+        # False until the aggregates cover every stored analysis (snapshot loaded or rebuilt)
+        self._complete = False
+        # Files recorded or discarded while a rebuild is scanning; None marks a discarded one
+        self._pending: Optional[Dict[str, Optional[Contribution]]] = None
+        # Changes not yet written; replayed onto the snapshot when another process wrote it meanwhile
+        self._changed: Dict[str, Optional[Contribution]] = {}
+        self._timer: Optional[threading.Timer] = None
+        # (inode, mtime) of the snapshot as last read or written by this process
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    def init_app(self, app) -> None:
+        """Load the snapshot from CORPUS_STATS_PATH (default <UPLOAD_FOLDER>/corpus_stats.json)"""
+        default_path = os.path.join(app.config.get('UPLOAD_FOLDER', 'uploads'), 'corpus_stats.json')
+        self.path = app.config.get('CORPUS_STATS_PATH', default_path)
+        self.save_interval = app.config.get('CORPUS_STATS_SAVE_INTERVAL', self.save_interval)
+        self.load()
+        atexit.register(self.flush)
+
+    def start(self) -> None:
+        """Without a snapshot, rebuild in the background so analyses stored before now are counted once"""
+        if not self.loaded:
+            self.rebuild_async()
+
+    def record(self, file_id: str, user_id: str, analysis: Dict[str, Any]) -> None:
+        """Count a completed analysis in place of whatever was counted for the file before
+
+        Only memory is touched here; the snapshot is written by flush() at
+        most once per save_interval.
+        """
+        self._set(file_id, (user_id, summarize(analysis)))
+
+    def discard(self, file_id: str) -> None:
+        """Stop counting a file's analysis, e.g. once the retention sweep deletes it"""
+        self._set(file_id, None)
+
+    def query(self, user_id: Optional[str] = None, days: int = DEFAULT_TIMELINE_DAYS) -> Dict[str, Any]:
+        self._refresh()
+        with self._lock:
+            if user_id is not None:
+                aggregate = self._users.get(user_id, Aggregate())
+                return dict(aggregate.to_dict(), user_id=user_id)
+
+            recent = sorted(self._days)[-days:] if days > 0 else []
+            return dict(
+                self._total.to_dict(),
+                users=len(self._users),
+                timeline=[
+                    {
+                        'day': day,
+                        'analyses': self._days[day].analyses,
+                        'mean_overall_score': self._days[day].to_dict()['score_histograms']['overall_score']['mean']
+                    }
+                    for day in recent
+                ],
+                rebuilt_at=self._rebuilt_at,
+                generation=self._generation,
+                complete=self._complete
+            )
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Recompute every aggregate from the stored analyses of files marked analyzed
+
+        Files recorded or discarded while the scan runs keep their recorded
+        state. Each rebuild writes the next snapshot generation; when another
+        process wrote a newer generation during the scan, its count is taken
+        instead of this one.
+        """
+        with self._rebuild_lock:
+            snapshot = self._read_snapshot()
+            started = snapshot[1].get('generation', 0) if snapshot is not None else 0
+            with self._lock:
+                self._pending = {}
+            try:
+                scanned: Dict[str, Contribution] = {}
+                skipped = 0
+
+                for file_id, metadata_path in self.storage.iter_artifacts('metadata'):
+                    metadata = self._read_json(metadata_path)
+                    if metadata is None or metadata.get('status') != 'analyzed':
+                        skipped += 1
+                        continue
+                    analysis = self._read_json(self.storage.artifact_path(file_id, 'analysis'))
+                    if analysis is None:
+                        skipped += 1
+                        continue
+                    scanned[file_id] = (metadata.get('user_id', 'anonymous'), summarize(analysis))
+
+                with self._locked():
+                    snapshot = self._read_snapshot()
+                    with self._lock:
+                        reconciled = len(self._pending)
+                        adopted = snapshot is not None and snapshot[1].get('generation', 0) > started
+                        if adopted:
+                            self._adopt(*snapshot)
+                        else:
+                            for file_id, contribution in self._pending.items():
+                                if contribution is None:
+                                    scanned.pop(file_id, None)
+                                else:
+                                    scanned[file_id] = contribution
+                            generation = max(started, self._generation) + 1
+                            self._reset()
+                            for file_id, contribution in scanned.items():
+                                self._replace(file_id, contribution)
+                            self._generation = generation
+                            self._rebuilt_at = datetime.now().isoformat()
+                            self._complete = True
+                        data = self._prepare_save()
+                    # Written straight away so other processes pick up the new generation
+                    self._save(data)
+            finally:
+                with self._lock:
+                    self._pending = None
+
+        self.loaded = True
+        return {'analyses': len(scanned), 'skipped': skipped, 'reconciled': reconciled,
+                'users': len(self._users), 'generation': self._generation, 'adopted': adopted}
+
+    def rebuild_async(self) -> None:
+        """Start a background rebuild unless one is already running"""
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(target=self.rebuild, name='corpus-stats-rebuild', daemon=True)
+            self._rebuild_thread.start()
+
+    def load(self) -> bool:
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return False
+        with self._lock:
+            self._adopt(*snapshot)
+        self.loaded = True
+        return True
+
+    def flush(self, force: bool = False) -> bool:
+        """Merge this process's changes into the snapshot; returns whether it wrote"""
+        with self._lock:
+            self._timer = None
+            # A partial count must not be saved, or the next start would skip the rebuild it still needs
+            if not self.path or not self._complete or not (self._changed or force):
+                return False
+
+        with self._locked():
+            snapshot = self._read_snapshot()
+            with self._lock:
+                if snapshot is not None and snapshot[0] != self._snapshot_stamp:
+                    self._adopt(*snapshot)
+                data = self._prepare_save()
+            self._save(data)
+        return True
+
+    def _reset(self) -> None:
+        self._total = Aggregate()
+        self._users: Dict[str, Aggregate] = {}
+        self._days: Dict[str, Aggregate] = {}
+        self._files: Dict[str, Contribution] = {}
+        self._generation = 0
+        self._rebuilt_at: Optional[str] = None
+
+    def _set(self, file_id: str, contribution: Optional[Contribution]) -> None:
+        with self._lock:
+            self._replace(file_id, contribution)
+            self._changed[file_id] = contribution
+            if self._pending is not None:
+                self._pending[file_id] = contribution
+            self._schedule_save()
+
+    def _replace(self, file_id: str, contribution: Optional[Contribution]) -> None:
+        # Called with the lock held
+        counted = self._files.pop(file_id, None)
+        if counted is not None:
+            self._apply(self._total, self._users, self._days, *counted, -1)
+        if contribution is not None:
+            self._apply(self._total, self._users, self._days, *contribution, 1)
+            self._files[file_id] = contribution
+
+    def _adopt(self, stamp: Tuple[int, int], data: Dict[str, Any]) -> None:
+        """Take over a snapshot read from disk and replay the changes not written yet; called with the lock held"""
+        self._total = Aggregate.restore(data.get('total', {}))
+        self._users = {user: Aggregate.restore(agg) for user, agg in data.get('users', {}).items()}
+        self._days = {day: Aggregate.restore(agg) for day, agg in data.get('days', {}).items()}
+        self._files = {file_id: (user_id, summary) for file_id, (user_id, summary) in data['files'].items()}
+        self._generation = data.get('generation', 0)
+        self._rebuilt_at = data.get('rebuilt_at')
+        self._snapshot_stamp = stamp
+        self._complete = True
+        for file_id, contribution in self._changed.items():
+            self._replace(file_id, contribution)
+
+    def _prepare_save(self) -> Dict[str, Any]:
+        # Called with the lock held; the changes are part of the returned snapshot from here on
+        self._changed = {}
+        return {
+            'generation': self._generation,
+            'total': self._total.snapshot(),
+            'users': {user: aggregate.snapshot() for user, aggregate in self._users.items()},
+            'days': {day: aggregate.snapshot() for day, aggregate in self._days.items()},
+            'files': {file_id: list(contribution) for file_id, contribution in self._files.items()},
+            'rebuilt_at': self._rebuilt_at
+        }
+
+    def _refresh(self) -> None:
+        """Pick up a snapshot another process wrote, such as a `flask rebuild-stats`, without recounting"""
+        with self._save_lock:
+            try:
+                if not self.path or self._stamp(self.path) == self._snapshot_stamp:
+                    return
+            except OSError:
+                return
+            snapshot = self._read_snapshot()
+            if snapshot is not None:
+                with self._lock:
+                    self._adopt(*snapshot)
+
+    def _read_snapshot(self) -> Optional[Tuple[Tuple[int, int], Dict[str, Any]]]:
+        """(stamp, data) of the snapshot on disk; None if missing, unreadable or without per-file counts"""
+        if not self.path:
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                stamp = self._stamp(f.fileno())
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Snapshots written before per-file counts cannot take merges or deletes; rebuild instead
+        if 'files' not in data:
+            return None
+        return stamp, data
+
+    @contextmanager
+    def _locked(self):
+        """Serialize snapshot writes across threads and, where flock exists, across processes"""
+        with self._save_lock:
+            if fcntl is None or not self.path:
+                yield
+                return
+            with open(self.path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        # Straight from the store, so a full scan does not evict the hot entries of the results cache
+        try:
+            return json.loads(self.store.read(path))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _apply(total: Aggregate, users: Dict[str, Aggregate], days: Dict[str, Aggregate],
+               user_id: str, summary: Dict[str, Any], sign: int) -> None:
+        total.apply(summary, sign)
+        for groups, key in ((users, user_id), (days, summary['day'])):
+            aggregate = groups.setdefault(key, Aggregate())
+            aggregate.apply(summary, sign)
+            # A re-analysis can move a resume to another day; drop groups it leaves empty
+            if aggregate.analyses <= 0:
+                del groups[key]
+
+    def _schedule_save(self) -> None:
+        # Called with the lock held
+        if self._timer is None and self.path:
+            self._timer = threading.Timer(self.save_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @staticmethod
+    def _stamp(target) -> Tuple[int, int]:
+        status = os.stat(target)
+        return status.st_ino, status.st_mtime_ns
+
+    def _save(self, data: Dict[str, Any]) -> None:
+        # Called with the save lock held; the snapshot grows with users, days and counted files
+        directory, name = os.path.split(self.path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory or '.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+            self._snapshot_stamp = self._stamp(self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
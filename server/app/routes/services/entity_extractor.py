@@ -0,0 +1,216 @@
+import threading
+from typing import Dict, List, Any, Iterable, Optional
+
+import spacy
+
+
+# Entity labels produced by the rule patterns and the result key each is grouped under
+ENTITY_GROUPS = {
+    'ORG': 'companies',
+    'JOB_TITLE': 'job_titles',
+    'DATE': 'dates',
+    'DEGREE': 'degrees'
+}
+
+# Components of a trained pipeline that entity extraction never uses
+UNUSED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'textcat', 'morphologizer']
+
+DEFAULT_BATCH_SIZE = 32
+
+# Taxonomy the rule patterns are built from
+KNOWN_COMPANIES = [
+    'Google', 'Microsoft', 'Amazon', 'Apple', 'Meta', 'Facebook', 'Netflix', 'IBM', 'Oracle',
+    'Salesforce', 'Adobe', 'Intel', 'NVIDIA', 'Nvidia', 'Uber', 'Airbnb', 'Stripe', 'Shopify',
+    'Spotify', 'Twitter', 'LinkedIn', 'Accenture', 'Deloitte', 'Infosys', 'Wipro', 'Cognizant',
+    'Capgemini', 'SAP', 'Cisco', 'Dell', 'HP', 'Tesla', 'PayPal', 'Atlassian', 'GitHub', 'GitLab',
+    'Amazon Web Services', 'Goldman Sachs', 'JPMorgan Chase', 'Morgan Stanley', 'McKinsey',
+    'Boston Consulting Group', 'Bain & Company', 'Tata Consultancy Services', 'Ernst & Young', 'KPMG', 'PwC'
+]
+
+COMPANY_SUFFIXES = [
+    'inc', 'inc.', 'llc', 'ltd', 'ltd.', 'limited', 'corp', 'corp.', 'corporation', 'co.', 'company',
+    'gmbh', 'plc', 'technologies', 'technology', 'labs', 'systems', 'solutions', 'group', 'holdings',
+    'partners', 'consulting', 'software', 'studios', 'ventures', 'bank', 'analytics'
+]
+
+INSTITUTION_HEADS = ['university', 'college', 'institute', 'school', 'academy']
+
+SENIORITY = [
+    'senior', 'sr', 'sr.', 'junior', 'jr', 'jr.', 'lead', 'principal', 'staff', 'chief', 'head',
+    'associate', 'assistant', 'vice', 'executive', 'intern', 'graduate', 'entry-level'
+]
+
+TITLE_DOMAINS = [
+    'software', 'data', 'product', 'project', 'program', 'marketing', 'sales', 'business', 'systems',
+    'network', 'security', 'devops', 'cloud', 'frontend', 'front-end', 'backend', 'back-end', 'full',
+    'stack', 'full-stack', 'fullstack', 'web', 'mobile', 'machine', 'learning', 'ml', 'ai', 'qa',
+    'quality', 'assurance', 'test', 'operations', 'research', 'ux', 'ui', 'graphic', 'technical',
+    'it', 'financial', 'hr', 'human', 'resources', 'account', 'customer', 'support', 'success',
+    'site', 'reliability', 'platform', 'infrastructure', 'database', 'solutions', 'application',
+    'embedded', 'game', 'content', 'digital', 'engineering', 'general', 'office', 'teaching', 'java',
+    'python', 'javascript', '.net', 'ios', 'android', 'analytics', 'design', 'technology'
+]
+
+TITLE_HEADS = [
+    'engineer', 'developer', 'manager', 'analyst', 'designer', 'scientist', 'architect', 'consultant',
+    'administrator', 'specialist', 'coordinator', 'director', 'intern', 'officer', 'president',
+    'programmer', 'technician', 'lead', 'strategist', 'recruiter', 'accountant', 'researcher',
+    'founder', 'co-founder', 'cto', 'ceo', 'cfo', 'owner', 'tester', 'associate', 'representative',
+    'assistant', 'advisor', 'instructor', 'teacher', 'professor', 'editor', 'writer'
+]
+
+DEGREE_ABBREVIATIONS = [
+    'BS', 'B.S.', 'B.S', 'BSc', 'B.Sc.', 'B.Sc', 'BA', 'B.A.', 'BBA', 'B.E.', 'BEng', 'B.Eng.',
+    'BTech', 'B.Tech', 'B.Tech.', 'MS', 'M.S.', 'M.S', 'MSc', 'M.Sc.', 'M.Sc', 'MA', 'M.A.', 'MBA',
+    'M.B.A.', 'MEng', 'M.Eng.', 'MTech', 'M.Tech', 'M.Tech.', 'PhD', 'Ph.D.', 'Ph.D', 'MD', 'M.D.',
+    'JD', 'J.D.', 'MPhil', 'DPhil', 'BCA', 'MCA'
+]
+
+DEGREE_WORDS = ['bachelor', 'bachelors', 'master', 'masters', 'doctor', 'doctorate', 'associate', 'diploma']
+
+MONTHS = [
+    'jan', 'january', 'feb', 'february', 'mar', 'march', 'apr', 'april', 'may', 'jun', 'june',
+    'jul', 'july', 'aug', 'august', 'sep', 'sept', 'september', 'oct', 'october', 'nov',
+    'november', 'dec', 'december'
+]
+MONTH_TOKENS = MONTHS + [f"{month}." for month in MONTHS if len(month) <= 4]
+ONGOING = ['present', 'current', 'now', 'today']
+RANGE_SEPARATORS = ['-', '–', '—', 'to', 'until']
+
+
+def _date_patterns() -> List[Dict[str, Any]]:
+    year = {'TEXT': {'REGEX': r'^(19|20)\d{2}$'}}
+    month = {'LOWER': {'IN': MONTH_TOKENS}}
+    numeric = {'TEXT': {'REGEX': r'^(0?[1-9]|1[0-2])[/.](19|20)\d{2}$'}}
+    points = [[month, year], [year], [numeric]]
+    ends = points + [[{'LOWER': {'IN': ONGOING}}]]
+    separator = {'LOWER': {'IN': RANGE_SEPARATORS}}
+
+    patterns = [{'label': 'DATE', 'pattern': start} for start in points]
+    for start in points:
+        for end in ends:
+            patterns.append({'label': 'DATE', 'pattern': start + [separator] + end})
+    return patterns
+
+
+def _degree_patterns() -> List[Dict[str, Any]]:
+    abbreviation = {'TEXT': {'IN': DEGREE_ABBREVIATIONS}}
+    word = {'LOWER': {'IN': DEGREE_WORDS}}
+    possessive = {'ORTH': {'IN': ["'s", "’s"]}, 'OP': '?'}
+    field = {'IS_TITLE': True, 'OP': '+'}
+
+    return [
+        {'label': 'DEGREE', 'pattern': [abbreviation]},
+        {'label': 'DEGREE', 'pattern': [abbreviation, {'LOWER': {'IN': ['in', 'of']}}, field]},
+        {'label': 'DEGREE', 'pattern': [word, possessive, {'LOWER': {'IN': ['of', 'in']}}, field]},
+        {'label': 'DEGREE', 'pattern': [word, possessive, {'LOWER': 'of'}, field, {'LOWER': 'in'}, field]},
+        {'label': 'DEGREE', 'pattern': [word, possessive, {'LOWER': 'degree'}]}
+    ]
+
+
+def _job_title_patterns() -> List[Dict[str, Any]]:
+    seniority = {'LOWER': {'IN': SENIORITY}, 'OP': '*'}
+    domain = {'LOWER': {'IN': TITLE_DOMAINS}, 'OP': '*'}
+    # Requiring a capitalised head keeps prose like "worked with the product manager" out
+    head = {'LOWER': {'IN': TITLE_HEADS}, 'IS_LOWER': False}
+
+    return [
+        {'label': 'JOB_TITLE', 'pattern': [seniority, domain, head]},
+        {'label': 'JOB_TITLE', 'pattern': [seniority, head, {'LOWER': 'of'}, {'IS_TITLE': True, 'OP': '+'}]}
+    ]
+
+
+def _company_patterns() -> List[Dict[str, Any]]:
+    stop = SENIORITY + TITLE_HEADS + TITLE_DOMAINS + MONTHS
+    name = {'IS_TITLE': True, 'LOWER': {'NOT_IN': stop}}
+    suffix = {'LOWER': {'IN': COMPANY_SUFFIXES}, 'IS_LOWER': False}
+
+    patterns = [{'label': 'ORG', 'pattern': company} for company in KNOWN_COMPANIES]
+    # Names are bounded to three words so a suffix cannot swallow the title before it
+    for length in (1, 2, 3):
+        patterns.append({'label': 'ORG', 'pattern': [name] * length + [suffix]})
+    for institution in INSTITUTION_HEADS:
+        patterns.append({'label': 'ORG', 'pattern': [
+            {'LOWER': institution, 'IS_LOWER': False}, {'LOWER': 'of'}, {'IS_TITLE': True, 'OP': '+'}
+        ]})
+        patterns.append({'label': 'ORG', 'pattern': [
+            name, {'IS_TITLE': True, 'OP': '?'}, {'LOWER': institution, 'IS_LOWER': False}
+        ]})
+    return patterns
+
+
+def build_patterns() -> List[Dict[str, Any]]:
+    """EntityRuler patterns for companies, job titles, dates and degrees"""
+    return _company_patterns() + _job_title_patterns() + _date_patterns() + _degree_patterns()
+
+
+def build_pipeline(model: Optional[str] = None):
+    """A blank English pipeline with the rule patterns, or a trained one with unused components excluded"""
+    if model:
+        nlp = spacy.load(model, exclude=UNUSED_COMPONENTS)
+        before = 'ner' if 'ner' in nlp.pipe_names else None
+        ruler = nlp.add_pipe('entity_ruler', before=before, config={'overwrite_ents': True})
+    else:
+        nlp = spacy.blank('en')
+        ruler = nlp.add_pipe('entity_ruler')
+
+    ruler.add_patterns(build_patterns())
+    return nlp
+
+
+# Pipelines by model name, built once per process (worker processes build their own)
+_pipelines: Dict[Optional[str], Any] = {}
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline(model: Optional[str] = None):
+    nlp = _pipelines.get(model)
+    if nlp is not None:
+        return nlp
+
+    with _pipeline_lock:
+        if model not in _pipelines:
+            _pipelines[model] = build_pipeline(model)
+        return _pipelines[model]
+
+
+class EntityExtractor:
+    def __init__(self, model: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Offline extraction of companies, job titles, dates and degrees from resume text"""
+        self.model = model
+        self.batch_size = batch_size
+
+    def init_app(self, app) -> None:
+        self.model = app.config.get('ENTITY_MODEL', self.model)
+        self.batch_size = app.config.get('ENTITY_BATCH_SIZE', self.batch_size)
+
+    @property
+    def nlp(self):
+        return get_pipeline(self.model)
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Entities of a single document"""
+        return self._collect(self.nlp(text or ''))
+
+    def extract_batch(self, texts: Iterable[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entities of many documents, streamed through nlp.pipe in batches"""
+        docs = self.nlp.pipe((text or '' for text in texts), batch_size=batch_size or self.batch_size)
+        return [self._collect(doc) for doc in docs]
+
+    @staticmethod
+    def _collect(doc) -> Dict[str, Any]:
+        grouped = {group: [] for group in ENTITY_GROUPS.values()}
+        entities = []
+
+        for ent in doc.ents:
+            group = ENTITY_GROUPS.get(ent.label_)
+            if group is None:
+                continue
+            # Collapse line breaks inside a span, e.g. a degree wrapped onto the next line
+            text = ' '.join(ent.text.split())
+            entities.append({'text': text, 'label': ent.label_, 'start': ent.start_char, 'end': ent.end_char})
+            if text not in grouped[group]:
+                grouped[group].append(text)
+
+        grouped['entities'] = entities
+        return grouped
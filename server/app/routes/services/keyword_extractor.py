@@ -1,15 +1,13 @@
-import re
 from typing import Dict, List, Any
 from collections import Counter
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from .tokenizer import TermMatcher, shared_tokens
 
 class KeywordExtractor:
     def __init__(self):
         """Initialize keyword extractor with predefined keyword categories"""
         try:
-            nltk.download('punkt', quiet=True)
             nltk.download('stopwords', quiet=True)
             self.stop_words = set(stopwords.words('english'))
         except:
@@ -66,16 +64,22 @@ class KeywordExtractor:
             ]
         }
 
+        # Token-boundary matchers, so 'java' no longer matches inside 'javascript' or 'go' inside 'google'
+        self._technical_matchers = {
+            category: TermMatcher(keywords) for category, keywords in self.technical_skills.items()
+        }
+        self._soft_skill_matcher = TermMatcher(self.soft_skills)
+        self._industry_matchers = {
+            industry: TermMatcher(keywords) for industry, keywords in self.industry_keywords.items()
+        }
+
     def extract_technical_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract technical keywords by category"""
-        text_lower = text.lower()
+        tokens = shared_tokens(text)
         found_keywords = {}
         
-        for category, keywords in self.technical_skills.items():
-            found = []
-            for keyword in keywords:
-                if keyword in text_lower:
-                    found.append(keyword)
+        for category, matcher in self._technical_matchers.items():
+            found = matcher.find(tokens)
             if found:
                 found_keywords[category] = found
         
@@ -83,25 +87,15 @@ class KeywordExtractor:
 
     def extract_soft_skills(self, text: str) -> List[str]:
         """Extract soft skills from text"""
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in self.soft_skills:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills
+        return self._soft_skill_matcher.find(shared_tokens(text))
 
     def extract_industry_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract industry-specific keywords"""
-        text_lower = text.lower()
+        tokens = shared_tokens(text)
         found_keywords = {}
         
-        for industry, keywords in self.industry_keywords.items():
-            found = []
-            for keyword in keywords:
-                if keyword in text_lower:
-                    found.append(keyword)
+        for industry, matcher in self._industry_matchers.items():
+            found = matcher.find(tokens)
             if found:
                 found_keywords[industry] = found
         
@@ -109,12 +103,7 @@ class KeywordExtractor:
 
     def extract_custom_keywords(self, text: str, min_length: int = 3) -> List[str]:
         """Extract custom keywords using frequency analysis"""
-        try:
-            # Tokenize text
-            tokens = word_tokenize(text.lower())
-        except:
-            # Fallback tokenization
-            tokens = re.findall(r'\b\w+\b', text.lower())
+        tokens = shared_tokens(text)
         
         # Filter tokens
         filtered_tokens = [
@@ -138,14 +127,14 @@ class KeywordExtractor:
 
     def analyze_keyword_density(self, text: str, keywords: List[str]) -> Dict[str, Any]:
         """Analyze keyword density in the text"""
-        word_count = len(text.split())
+        word_count = max(len(text.split()), 1)
         keyword_counts = {}
         total_keyword_occurrences = 0
         
-        text_lower = text.lower()
+        occurrences = TermMatcher(keywords).counts(shared_tokens(text))
         
         for keyword in keywords:
-            count = text_lower.count(keyword.lower())
+            count = occurrences[keyword]
             if count > 0:
                 keyword_counts[keyword] = {
                     'count': count,
@@ -207,23 +196,12 @@ class KeywordExtractor:
         
         return suggestions[:8]  # Return top 8 suggestions
 
-    def extract_keywords(self, file_id: str) -> Dict[str, Any]:
+    def extract_keywords(self, text: str) -> Dict[str, Any]:
         """Main keyword extraction function"""
-        # For demo purposes, return mock analysis
-        # In real implementation, this would load and analyze the actual file
-        
-        mock_text = """
-        Senior Software Developer with 5+ years of experience in web development.
-        Proficient in Python, JavaScript, React, and Node.js. Strong background
-        in database design using PostgreSQL and MongoDB. Experience with AWS
-        cloud services and Docker containerization. Excellent problem-solving
-        skills and team leadership abilities.
-        """
-        
-        technical_keywords = self.extract_technical_keywords(mock_text)
-        soft_skills = self.extract_soft_skills(mock_text)
-        industry_keywords = self.extract_industry_keywords(mock_text)
-        custom_keywords = self.extract_custom_keywords(mock_text)
+        technical_keywords = self.extract_technical_keywords(text)
+        soft_skills = self.extract_soft_skills(text)
+        industry_keywords = self.extract_industry_keywords(text)
+        custom_keywords = self.extract_custom_keywords(text)
         
         # Combine all keywords for density analysis
         all_keywords = []
@@ -233,7 +211,7 @@ class KeywordExtractor:
         for category_keywords in industry_keywords.values():
             all_keywords.extend(category_keywords)
         
-        density_analysis = self.analyze_keyword_density(mock_text, all_keywords)
+        density_analysis = self.analyze_keyword_density(text, all_keywords)
         suggestions = self.suggest_missing_keywords({
             'technical': technical_keywords,
             'soft_skills': soft_skills,
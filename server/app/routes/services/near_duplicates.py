@@ -0,0 +1,187 @@
+import json
+import zlib
+import threading
+from typing import Dict, List, Any, Optional, Set
+
+import numpy as np
+
+from .compressed_storage import open_artifact
+from .tokenizer import tokenize, words
+
+
+NUM_PERM = 128
+# 16 bands of 8 rows: a pair becomes a candidate with probability 1 - (1 - J**8)**16, i.e.
+# ~6% at 0.5 Jaccard, ~61% at 0.7, ~95% at SIMILARITY_THRESHOLD (0.8) and ~100% from 0.9
+NUM_BANDS = 16
+SHINGLE_SIZE = 5
+# Estimated Jaccard similarity at which a candidate is reported as a near-duplicate
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = (1 << 32) - 1
+_HASH_MASK = np.uint64(_MAX_HASH)
+# Shingles hashed per step; bounds the (permutations x shingles) matrix for very long CVs
+_CHUNK_SIZE = 4096
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """32-bit hashes of the overlapping word n-grams of a text"""
+    tokens = words(tokenize(text))
+    if len(tokens) < size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8')) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        """Fixed-seed universal hash family, so signatures stay comparable across processes and restarts"""
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a, b and the shingle hashes are all below 2**32, so a * h + b cannot overflow uint64
+        self.a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text, or None when it has no words (e.g. a scanned, image-only PDF)"""
+        hashes = np.fromiter(shingles(text), dtype=np.uint64)
+        if not hashes.size:
+            # An all-max signature would make every empty text a perfect match of every other
+            return None
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        for start in range(0, hashes.size, _CHUNK_SIZE):
+            chunk = hashes[start:start + _CHUNK_SIZE]
+            permuted = ((np.outer(self.a, chunk) + self.b[:, None]) % _MERSENNE_PRIME) & _HASH_MASK
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+
+        return signature
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.mean(first == second))
+
+
+class DuplicateIndex:
+    def __init__(self, num_perm: int = NUM_PERM, num_bands: int = NUM_BANDS,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        """LSH index over MinHash signatures plus an exact index of file content hashes"""
+        if num_perm % num_bands:
+            raise ValueError('num_perm must be a multiple of num_bands')
+
+        self.hasher = MinHasher(num_perm)
+        self.num_bands = num_bands
+        self.rows = num_perm // num_bands
+        self.threshold = threshold
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._owners: Dict[str, Optional[str]] = {}
+        self._content_hashes: Dict[str, str] = {}
+        self._by_content: Dict[str, Set[str]] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(num_bands)]
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        return self.hasher.signature(text)
+
+    def add(self, file_id: str, signature: Optional[np.ndarray], content_hash: Optional[str] = None,
+            owner: Optional[str] = None) -> None:
+        """Index a file; without a signature only its content hash is indexed"""
+        with self._lock:
+            self._remove(file_id)
+            self._owners[file_id] = owner
+            if signature is not None:
+                self._signatures[file_id] = signature
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, set()).add(file_id)
+            if content_hash:
+                self._content_hashes[file_id] = content_hash
+                self._by_content.setdefault(content_hash, set()).add(file_id)
+
+    def remove(self, file_id: str) -> None:
+        with self._lock:
+            self._remove(file_id)
+
+    def signature_of(self, file_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            return self._signatures.get(file_id)
+
+    def owner_of(self, file_id: str) -> Optional[str]:
+        with self._lock:
+            return self._owners.get(file_id)
+
+    def load(self, storage) -> int:
+        """Rebuild the index from the signature artifacts written at analysis time"""
+        loaded = 0
+        for file_id, path in storage.iter_artifacts('signature'):
+            try:
+                with open_artifact(path) as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                continue
+            signature = stored.get('signature')
+            if signature is not None:
+                signature = np.array(signature, dtype=np.uint64)
+                if signature.size != self.hasher.num_perm:
+                    continue
+            # Signatures written before owners were recorded match no one's own files
+            self.add(file_id, signature, stored.get('content_hash'), stored.get('user_id'))
+            loaded += 1
+        return loaded
+
+    def query(self, signature: Optional[np.ndarray], exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Indexed files whose estimated similarity reaches the threshold, most similar first"""
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            candidates.discard(exclude)
+            scored = [(file_id, similarity(signature, self._signatures[file_id])) for file_id in candidates]
+
+        matches = [
+            {'file_id': file_id, 'similarity': round(score, 3)}
+            for file_id, score in scored if score >= self.threshold
+        ]
+        return sorted(matches, key=lambda match: match['similarity'], reverse=True)
+
+    def exact_matches(self, content_hash: Optional[str], exclude: Optional[str] = None) -> List[str]:
+        """Other indexed files with byte-identical content"""
+        if not content_hash:
+            return []
+        with self._lock:
+            return sorted(self._by_content.get(content_hash, set()) - {exclude})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'indexed': len(self._signatures),
+                'distinct_contents': len(self._by_content),
+                'bands': self.num_bands,
+                'rows_per_band': self.rows,
+                'threshold': self.threshold
+            }
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.num_bands)]
+
+    def _remove(self, file_id: str) -> None:
+        # Called with the lock held
+        self._owners.pop(file_id, None)
+        signature = self._signatures.pop(file_id, None)
+        if signature is not None:
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(file_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+        content_hash = self._content_hashes.pop(file_id, None)
+        if content_hash is not None:
+            twins = self._by_content.get(content_hash)
+            if twins is not None:
+                twins.discard(file_id)
+                if not twins:
+                    del self._by_content[content_hash]
@@ -0,0 +1,352 @@
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable, KeepTogether
+
+from .result_cache import ResultCache
+from .worker_processes import worker_context
+
+
+# Bump when the layout code changes so cached PDFs are rendered again
+RENDER_VERSION = 1
+
+TEMPLATES = {
+    'professional': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'italic_font': 'Helvetica-Oblique',
+        'name_size': 20,
+        'heading_size': 12,
+        'body_size': 10,
+        'accent': '#1f3a5f',
+        'margin': 54,
+        'sections': ['summary', 'experience', 'education', 'skills', 'projects', 'certifications']
+    },
+    'compact': {
+        'font': 'Times-Roman',
+        'bold_font': 'Times-Bold',
+        'italic_font': 'Times-Italic',
+        'name_size': 16,
+        'heading_size': 11,
+        'body_size': 9,
+        'accent': '#000000',
+        'margin': 36,
+        'sections': ['summary', 'skills', 'experience', 'projects', 'education', 'certifications']
+    }
+}
+DEFAULT_TEMPLATE = 'professional'
+
+# Bounds of the on-disk render cache; least recently used PDFs go first
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_TTL = 30 * 24 * 60 * 60
+
+# Only these fields reach the page, so only they key the render cache
+RENDERED_FIELDS = ['personalInfo', 'summary', 'experience', 'education', 'skills', 'projects', 'certifications']
+
+SECTION_TITLES = {
+    'summary': 'Professional Summary',
+    'experience': 'Experience',
+    'education': 'Education',
+    'skills': 'Skills',
+    'projects': 'Projects',
+    'certifications': 'Certifications'
+}
+
+# Compiled templates, built once per process (worker processes compile their own)
+_compiled_templates: Dict[str, Dict[str, Any]] = {}
+_compile_lock = threading.Lock()
+
+
+def compile_template(name: str) -> Dict[str, Any]:
+    """Build the paragraph styles for a template once and reuse them"""
+    compiled = _compiled_templates.get(name)
+    if compiled is not None:
+        return compiled
+
+    with _compile_lock:
+        if name in _compiled_templates:
+            return _compiled_templates[name]
+
+        spec = TEMPLATES[name]
+        accent = colors.HexColor(spec['accent'])
+        body = spec['body_size']
+        compiled = {
+            'spec': spec,
+            'accent': accent,
+            'name': ParagraphStyle('name', fontName=spec['bold_font'], fontSize=spec['name_size'],
+                                   leading=spec['name_size'] * 1.2, textColor=accent),
+            'title': ParagraphStyle('title', fontName=spec['font'], fontSize=body + 1, leading=(body + 1) * 1.3),
+            'contact': ParagraphStyle('contact', fontName=spec['font'], fontSize=body - 1,
+                                      leading=(body - 1) * 1.4, textColor=colors.HexColor('#444444')),
+            'heading': ParagraphStyle('heading', fontName=spec['bold_font'], fontSize=spec['heading_size'],
+                                      leading=spec['heading_size'] * 1.3, textColor=accent, spaceBefore=8),
+            'entry': ParagraphStyle('entry', fontName=spec['bold_font'], fontSize=body, leading=body * 1.3),
+            'meta': ParagraphStyle('meta', fontName=spec['italic_font'], fontSize=body - 1, leading=(body - 1) * 1.3,
+                                   textColor=colors.HexColor('#555555')),
+            'body': ParagraphStyle('body', fontName=spec['font'], fontSize=body, leading=body * 1.35, spaceAfter=4)
+        }
+        _compiled_templates[name] = compiled
+        return compiled
+
+
+def render_key(resume: Dict[str, Any], template: str) -> str:
+    """Content hash of everything that affects the rendered PDF"""
+    content = {field: resume.get(field) for field in RENDERED_FIELDS}
+    payload = json.dumps([RENDER_VERSION, template, TEMPLATES[template], content],
+                         sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _text(value: Any) -> str:
+    return escape(str(value).strip()) if value is not None else ''
+
+
+def _join(*parts: Any) -> str:
+    return ' | '.join(_text(part) for part in parts if part and str(part).strip())
+
+
+def _section_flowables(section: str, resume: Dict[str, Any], styles: Dict[str, Any]) -> list:
+    items = []
+
+    if section == 'summary':
+        if resume.get('summary'):
+            items.append(Paragraph(_text(resume['summary']), styles['body']))
+
+    elif section == 'experience':
+        for job in resume.get('experience') or []:
+            entry = [Paragraph(_join(job.get('title'), job.get('company')), styles['entry'])]
+            meta = _join(job.get('duration'), job.get('location'))
+            if meta:
+                entry.append(Paragraph(meta, styles['meta']))
+            if job.get('description'):
+                entry.append(Paragraph(_text(job['description']), styles['body']))
+            items.append(KeepTogether(entry))
+
+    elif section == 'education':
+        for school in resume.get('education') or []:
+            entry = [Paragraph(_join(school.get('degree'), school.get('institution')), styles['entry'])]
+            gpa = f"GPA {school['gpa']}" if school.get('gpa') else ''
+            meta = _join(school.get('year'), gpa, school.get('location'))
+            if meta:
+                entry.append(Paragraph(meta, styles['meta']))
+            items.append(KeepTogether(entry))
+
+    elif section == 'skills':
+        skills = [_text(skill) for skill in resume.get('skills') or [] if str(skill).strip()]
+        if skills:
+            items.append(Paragraph(', '.join(skills), styles['body']))
+
+    elif section == 'projects':
+        for project in resume.get('projects') or []:
+            entry = [Paragraph(_text(project.get('name')), styles['entry'])]
+            if project.get('description'):
+                entry.append(Paragraph(_text(project['description']), styles['body']))
+            meta = _join(project.get('technologies'), project.get('link'))
+            if meta:
+                entry.append(Paragraph(meta, styles['meta']))
+            items.append(KeepTogether(entry))
+
+    elif section == 'certifications':
+        for cert in resume.get('certifications') or []:
+            if isinstance(cert, dict):
+                line = _join(cert.get('name'), cert.get('issuer'), cert.get('date'))
+            else:
+                line = _text(cert)
+            if line:
+                items.append(Paragraph(line, styles['body']))
+
+    return items
+
+
+def render_pdf(resume: Dict[str, Any], template: str = DEFAULT_TEMPLATE) -> bytes:
+    """Render a generated resume to PDF bytes; runs inside the render workers"""
+    styles = compile_template(template)
+    spec = styles['spec']
+    info = resume.get('personalInfo') or {}
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=LETTER, leftMargin=spec['margin'], rightMargin=spec['margin'],
+                            topMargin=spec['margin'], bottomMargin=spec['margin'],
+                            title=str(info.get('name') or 'Resume'), invariant=True)
+
+    story = [Paragraph(_text(info.get('name')) or 'Resume', styles['name'])]
+    if info.get('title'):
+        story.append(Paragraph(_text(info['title']), styles['title']))
+    contact = _join(info.get('email'), info.get('phone'), info.get('location'),
+                    info.get('linkedin'), info.get('website'))
+    if contact:
+        story.append(Paragraph(contact, styles['contact']))
+
+    for section in spec['sections']:
+        items = _section_flowables(section, resume, styles)
+        if not items:
+            continue
+        story.append(Paragraph(SECTION_TITLES[section], styles['heading']))
+        story.append(HRFlowable(width='100%', thickness=0.75, color=styles['accent'], spaceAfter=4))
+        story.extend(items)
+        story.append(Spacer(1, 4))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+class PDFRenderer:
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 2,
+                 memory_cache: Optional[ResultCache] = None, use_processes: bool = True,
+                 disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES, disk_ttl: Optional[float] = DEFAULT_DISK_TTL):
+        """Render generated resumes to PDF off the request thread, caching by content hash"""
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_ttl = disk_ttl
+        self.memory_cache = memory_cache if memory_cache is not None else ResultCache(
+            max_entries=256, max_bytes=64 * 1024 * 1024, ttl_seconds=60 * 60)
+
+        self._executor = None
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Bytes written since the last prune, on top of what that prune left
+        self._disk_bytes: Optional[int] = None
+        self._prune_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Read RENDER_CACHE_MAX_BYTES and RENDER_CACHE_TTL (seconds, None keeps PDFs until evicted by size)"""
+        self.disk_max_bytes = app.config.get('RENDER_CACHE_MAX_BYTES', self.disk_max_bytes)
+        self.disk_ttl = app.config.get('RENDER_CACHE_TTL', self.disk_ttl)
+        if self.cache_dir is None:
+            self.cache_dir = os.path.join(app.config['UPLOAD_FOLDER'], '_render_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def render(self, resume: Dict[str, Any], template: str = DEFAULT_TEMPLATE,
+               timeout: float = 30) -> Tuple[str, bytes]:
+        """Return (content hash, PDF bytes), rendering only on a cache miss"""
+        if template not in TEMPLATES:
+            raise ValueError(f"Unknown template: {template}")
+
+        key = render_key(resume, template)
+
+        pdf = self.memory_cache.get(key)
+        if pdf is not None:
+            return key, pdf
+
+        pdf = self._read_disk(key)
+        if pdf is not None:
+            self.memory_cache.set(key, pdf, len(pdf))
+            return key, pdf
+
+        # Identical concurrent downloads share one render
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._get_executor().submit(render_pdf, resume, template)
+                self._in_flight[key] = future
+
+        try:
+            pdf = future.result(timeout=timeout)
+        finally:
+            if owner:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+        if owner:
+            self.memory_cache.set(key, pdf, len(pdf))
+            self._write_disk(key, pdf)
+        return key, pdf
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.use_processes:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                         mp_context=worker_context(__name__))
+                except (OSError, NotImplementedError):
+                    self._executor = None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pdf-render')
+        return self._executor
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                pdf = f.read()
+            # Mark it recently used for pruning
+            os.utime(path)
+            return pdf
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, pdf: bytes) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(pdf)
+        os.replace(temp_path, path)
+
+        with self._prune_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(pdf)
+            over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over:
+            self.prune_disk()
+
+    def prune_disk(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Delete cached PDFs past the TTL, then least recently used ones until the cache fits its byte budget"""
+        now = time.time() if now is None else now
+        if not self.cache_dir or not self._prune_lock.acquire(blocking=False):
+            # Another thread is already pruning
+            return {'deleted': 0, 'bytes_freed': 0}
+        try:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                with os.scandir(self.cache_dir) as shards:
+                    for shard in shards:
+                        if not shard.is_dir():
+                            continue
+                        with os.scandir(shard.path) as files:
+                            for entry in files:
+                                if entry.is_file() and entry.name.endswith('.pdf'):
+                                    stat = entry.stat()
+                                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            deleted = freed = 0
+            for mtime, size, path in entries:
+                expired = self.disk_ttl is not None and now - mtime > self.disk_ttl
+                if not expired and total <= self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                deleted += 1
+                freed += size
+
+            self._disk_bytes = total
+            return {'deleted': deleted, 'bytes_freed': freed}
+        finally:
+            self._prune_lock.release()
@@ -0,0 +1,132 @@
+import re
+import math
+from functools import lru_cache
+from typing import Dict, List, Any
+
+from .tokenizer import is_word, tokenize
+
+try:
+    import pyphen
+except ImportError:  # pyphen ships with textstat; without it the vowel-group heuristic is used
+    pyphen = None
+
+
+# Words come from the shared tokenizer. Resume lines rarely end in a full stop, so a
+# line break also closes a sentence; dots inside tokens like node.js are not boundaries.
+_SENTENCE_ENDS = frozenset('.!?')
+_WORD_PART_RE = re.compile(r'[a-z0-9]+')
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+
+# Like textstat, fragments of two words or fewer (headers, dates) are not counted as sentences
+MIN_SENTENCE_WORDS = 3
+POLYSYLLABLE_THRESHOLD = 3
+SYLLABLE_CACHE_SIZE = 65536
+
+_hyphenator = pyphen.Pyphen(lang='en_US') if pyphen is not None else None
+
+
+def _heuristic_syllables(word: str) -> int:
+    """Vowel-group estimate used when no hyphenation dictionary is available"""
+    count = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith('e') and not word.endswith(('le', 'ee')) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def syllable_count(word: str) -> int:
+    """Syllables in a lowercase word, cached across every document scored in this process"""
+    if not word.isalnum():
+        # well-known, node.js, c++: count the letter and digit runs
+        return sum(syllable_count(part) for part in _WORD_PART_RE.findall(word)) or 1
+    if word.isdigit():
+        return 1
+    if _hyphenator is not None:
+        return len(_hyphenator.positions(word)) + 1
+    return _heuristic_syllables(word)
+
+
+def _tokenize(text: str) -> Dict[str, Any]:
+    """Words, letter count and sentence count of a text in a single tokenizer pass"""
+    words: List[str] = []
+    letters = 0
+    sentences = 0
+
+    for line in text.split('\n'):
+        sentence_words = 0
+        for token in tokenize(line):
+            if token in _SENTENCE_ENDS:
+                if sentence_words >= MIN_SENTENCE_WORDS:
+                    sentences += 1
+                sentence_words = 0
+            elif is_word(token):
+                words.append(token)
+                letters += len(token) if token.isalnum() else sum(map(len, _WORD_PART_RE.findall(token)))
+                sentence_words += 1
+
+        if sentence_words >= MIN_SENTENCE_WORDS:
+            sentences += 1
+
+    return {'words': words, 'letters': letters, 'sentences': max(sentences, 1)}
+
+
+def _rating(reading_ease: float) -> str:
+    if reading_ease >= 70:
+        return 'Easy'
+    elif reading_ease >= 50:
+        return 'Standard'
+    elif reading_ease >= 30:
+        return 'Difficult'
+    return 'Very Difficult'
+
+
+def _metrics(tokens: Dict[str, Any]) -> Dict[str, Any]:
+    words = tokens['words']
+    word_count = len(words)
+    if not word_count:
+        return {
+            'score': 0,
+            'rating': 'Not enough text',
+            'flesch_reading_ease': 0.0,
+            'flesch_kincaid_grade': 0.0,
+            'gunning_fog': 0.0,
+            'smog_index': 0.0,
+            'coleman_liau_index': 0.0,
+            'automated_readability_index': 0.0,
+            'word_count': 0,
+            'sentence_count': 0,
+            'syllable_count': 0,
+            'polysyllable_count': 0
+        }
+
+    sentence_count = tokens['sentences']
+    per_word = [syllable_count(word) for word in words]
+    syllable_total = sum(per_word)
+    polysyllables = sum(1 for count in per_word if count >= POLYSYLLABLE_THRESHOLD)
+
+    words_per_sentence = word_count / sentence_count
+    syllables_per_word = syllable_total / word_count
+    letters_per_word = tokens['letters'] / word_count
+
+    reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    smog = 1.043 * math.sqrt(polysyllables * 30 / sentence_count) + 3.1291 if sentence_count >= 3 else 0.0
+
+    return {
+        'score': int(round(min(max(reading_ease, 0), 100))),
+        'rating': _rating(reading_ease),
+        'flesch_reading_ease': round(reading_ease, 2),
+        'flesch_kincaid_grade': round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 2),
+        'gunning_fog': round(0.4 * (words_per_sentence + 100 * polysyllables / word_count), 2),
+        'smog_index': round(smog, 2),
+        'coleman_liau_index': round(5.88 * letters_per_word - 29.6 * sentence_count / word_count - 15.8, 2),
+        'automated_readability_index': round(4.71 * letters_per_word + 0.5 * words_per_sentence - 21.43, 2),
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'syllable_count': syllable_total,
+        'polysyllable_count': polysyllables
+    }
+
+
+def score(text: str) -> Dict[str, Any]:
+    """Flesch, Flesch-Kincaid, Gunning Fog, SMOG, Coleman-Liau and ARI for one document"""
+    return _metrics(_tokenize(text or ''))
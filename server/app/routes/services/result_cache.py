@@ -0,0 +1,136 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from .compressed_storage import CompressedStore
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 300,
+                 store: Optional[CompressedStore] = None):
+        """Size-bounded LRU cache with TTL for parsed metadata and analysis sidecars"""
+        self.store = store if store is not None else CompressedStore()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, size in serialized bytes, expiry timestamp)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # key -> token of the load_json read in flight; a write or invalidation drops it
+        self._loading: Dict[str, object] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        """Store a value, evicting least recently used entries to stay within bounds"""
+        with self._lock:
+            self._loading.pop(key, None)
+            self._insert(key, value, size)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._loading.pop(key, None)
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loading.clear()
+            self._bytes = 0
+
+    def load_json(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a JSON sidecar through the cache; returns None if the file does not exist"""
+        cached = self.get(path)
+        if cached is not None:
+            return cached
+
+        token = object()
+        with self._lock:
+            self._loading[path] = token
+        try:
+            raw = self.store.read(path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._loading.get(path) is token:
+                    del self._loading[path]
+            return None
+
+        data = json.loads(raw)
+        with self._lock:
+            # Skip the fill if the entry was written or invalidated while we read, so a slow
+            # miss cannot put stale data back for a whole TTL
+            if self._loading.get(path) is token:
+                del self._loading[path]
+                self._insert(path, data, len(raw))
+        return data
+
+    def store_json(self, path: str, data: Dict[str, Any], compress: bool = False) -> None:
+        """Write a JSON sidecar in compact form, gzip-compressed if asked, and refresh its cache entry"""
+        raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        encoded = raw.encode('utf-8')
+
+        self.store.write(path, encoded, compress)
+        self.set(path, data, len(encoded))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _insert(self, key: str, value: Any, size: int) -> None:
+        # Called with the lock held
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            # Never let one oversized entry flush the whole cache
+            return
+
+        self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
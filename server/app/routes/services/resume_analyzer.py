@@ -3,14 +3,67 @@ import json
 import PyPDF2
 import docx
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import nltk
 from collections import Counter
+from .section_segmenter import segment, SegmentedDocument
+from . import readability
+from .tokenizer import TermMatcher, shared_tokens
+from .compressed_storage import mapped_original
+from .worker_processes import worker_context, warm_pool
+
+
+# PDFs with at least this many pages are split into page ranges extracted in worker processes
+PARALLEL_MIN_PAGES = 16
+# Every worker re-parses the PDF structure, so a range shorter than this costs more than it saves
+MIN_PAGES_PER_RANGE = 4
+
+
+def page_ranges(total_pages: int, workers: int, min_pages: int = MIN_PAGES_PER_RANGE) -> List[Tuple[int, int]]:
+    """Split [0, total_pages) into at most one contiguous range per worker"""
+    count = max(1, min(workers, total_pages // min_pages))
+    size = -(-total_pages // count)
+    return [(start, min(start + size, total_pages)) for start in range(0, total_pages, size)]
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> str:
+    """Text of pages [start, stop) of a PDF; runs in a worker process"""
+    with mapped_original(file_path) as source:
+        pdf_reader = PyPDF2.PdfReader(source)
+        return "".join(pdf_reader.pages[index].extract_text() + "\n" for index in range(start, stop))
+
+
+# Worker pools by size, started on first use or by warm_up(); forked from the preloaded fork server
+_page_pools: Dict[int, ProcessPoolExecutor] = {}
+_page_pool_lock = threading.Lock()
+
+
+def get_page_pool(workers: int) -> ProcessPoolExecutor:
+    with _page_pool_lock:
+        pool = _page_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context(__name__))
+            _page_pools[workers] = pool
+        return pool
+
+
+def discard_page_pool(workers: int) -> None:
+    with _page_pool_lock:
+        pool = _page_pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
 
 class ResumeAnalyzer:
     def __init__(self):
         """Initialize the resume analyzer with required NLTK data"""
+        self.parallel_min_pages = PARALLEL_MIN_PAGES
+        self.pdf_workers = os.cpu_count() or 1
+        
         try:
             nltk.download('punkt', quiet=True)
             nltk.download('stopwords', quiet=True)
@@ -34,19 +87,62 @@ class ResumeAnalyzer:
             'achieved', 'developed', 'implemented', 'managed', 'led', 'created',
             'improved', 'increased', 'reduced', 'optimized', 'designed', 'built'
         ]
+        
+        self._tech_matcher = TermMatcher(self.tech_keywords)
+        self._soft_skill_matcher = TermMatcher(self.soft_skills)
+        self._action_verb_matcher = TermMatcher(self.action_verbs)
+        self._skill_matcher = TermMatcher(self.tech_keywords + self.soft_skills)
+        
+        self.contact_pattern = re.compile(r'(email|phone|linkedin|github|@)', re.IGNORECASE)
+        self.bullet_pattern = re.compile(r'[•·‣▪▫◦‣]')
+        self.metric_pattern = re.compile(r'\d+%|\$\d+|\d+\+')
+
+    def init_app(self, app) -> None:
+        """Read PDF_PARALLEL_MIN_PAGES and PDF_EXTRACT_WORKERS (below 2 keeps extraction serial)"""
+        self.parallel_min_pages = app.config.get('PDF_PARALLEL_MIN_PAGES', self.parallel_min_pages)
+        self.pdf_workers = app.config.get('PDF_EXTRACT_WORKERS', self.pdf_workers)
+
+    def warm_up(self) -> None:
+        """Start the page extraction workers ahead of the first long PDF"""
+        if self.pdf_workers >= 2:
+            warm_pool(get_page_pool(self.pdf_workers), self.pdf_workers)
+
+    def iter_pdf_pages(self, file_path: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (page index, page count, page text) for each PDF page"""
+        try:
+            with mapped_original(file_path) as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                total = len(pdf_reader.pages)
+                for index, page in enumerate(pdf_reader.pages):
+                    yield index, total, page.extract_text() + "\n"
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {str(e)}")
 
     def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file"""
+        """Extract text from PDF file, in parallel page ranges once it is long enough to pay off"""
         try:
-            with open(file_path, 'rb') as file:
+            with mapped_original(file_path) as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                total = len(pdf_reader.pages)
+                if self.pdf_workers < 2 or total < self.parallel_min_pages:
+                    return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
+            return self.extract_pdf_ranges(file_path, total)
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
 
+    def extract_pdf_ranges(self, file_path: str, total_pages: int) -> str:
+        """Extract page ranges across the worker pool and reassemble them in page order"""
+        workers = self.pdf_workers
+        try:
+            pool = get_page_pool(workers)
+            futures = [pool.submit(extract_page_range, file_path, start, stop)
+                       for start, stop in page_ranges(total_pages, workers)]
+            return "".join(future.result() for future in futures)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool next time and finish serially here
+            discard_page_pool(workers)
+            return extract_page_range(file_path, 0, total_pages)
+
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
         try:
@@ -58,6 +154,13 @@ class ResumeAnalyzer:
         except Exception as e:
             raise Exception(f"Error reading DOCX: {str(e)}")
 
+    def iter_pages(self, file_path: str, file_type: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield extracted text page by page; DOCX files count as a single page"""
+        if file_type.lower() == 'pdf':
+            yield from self.iter_pdf_pages(file_path)
+        else:
+            yield 0, 1, self.extract_text(file_path, file_type)
+
     def extract_text(self, file_path: str, file_type: str) -> str:
         """Extract text from resume file based on type"""
         if file_type.lower() == 'pdf':
@@ -69,16 +172,16 @@ class ResumeAnalyzer:
 
     def analyze_keywords(self, text: str) -> Dict[str, Any]:
         """Analyze keywords in the resume text"""
-        text_lower = text.lower()
+        tokens = shared_tokens(text)
         
         # Find technical keywords
-        found_tech_keywords = [kw for kw in self.tech_keywords if kw in text_lower]
+        found_tech_keywords = self._tech_matcher.find(tokens)
         
         # Find soft skills
-        found_soft_skills = [skill for skill in self.soft_skills if skill in text_lower]
+        found_soft_skills = self._soft_skill_matcher.find(tokens)
         
         # Find action verbs
-        found_action_verbs = [verb for verb in self.action_verbs if verb in text_lower]
+        found_action_verbs = self._action_verb_matcher.find(tokens)
         
         return {
             'technical_keywords': found_tech_keywords,
@@ -87,28 +190,93 @@ class ResumeAnalyzer:
             'keyword_count': len(found_tech_keywords) + len(found_soft_skills)
         }
 
-    def analyze_structure(self, text: str) -> Dict[str, Any]:
+    def analyze_structure(self, text: str, document: Optional[SegmentedDocument] = None) -> Dict[str, Any]:
         """Analyze resume structure and sections"""
+        if document is None:
+            document = segment(text)
+
+        # Contact details rarely sit under a header, so fall back to the markers themselves
         sections = {
-            'contact': bool(re.search(r'(email|phone|linkedin|github)', text, re.IGNORECASE)),
-            'summary': bool(re.search(r'(summary|objective|profile)', text, re.IGNORECASE)),
-            'experience': bool(re.search(r'(experience|work|employment)', text, re.IGNORECASE)),
-            'education': bool(re.search(r'(education|degree|university|college)', text, re.IGNORECASE)),
-            'skills': bool(re.search(r'(skills|technologies|technical)', text, re.IGNORECASE))
+            'contact': bool(self.contact_pattern.search(text)),
+            'summary': document.has('summary'),
+            'experience': document.has('experience'),
+            'education': document.has('education'),
+            'skills': document.has('skills')
         }
         
         # Count bullet points (indicators of good formatting)
-        bullet_points = len(re.findall(r'[•·‣▪▫◦‣]', text))
+        bullet_points = len(self.bullet_pattern.findall(text))
         
         return {
             'sections_present': sections,
             'section_count': sum(sections.values()),
             'bullet_points': bullet_points,
-            'word_count': len(text.split()),
-            'has_quantifiable_achievements': bool(re.search(r'\d+%|\$\d+|\d+\+', text))
+            'word_count': document.word_count,
+            'has_quantifiable_achievements': bool(self.metric_pattern.search(text)),
+            'segments': document.to_dict()['sections']
         }
 
-    def calculate_ats_score(self, text: str, keywords: Dict[str, Any]) -> int:
+    def score_sections(self, document: SegmentedDocument) -> Dict[str, int]:
+        """Score each standard section from its own token slice"""
+        scores = {}
+
+        contact = document.get('contact')
+        contact_text = contact.body if contact else document.text
+        contact_score = 0
+        if re.search(r'[\w\.-]+@[\w\.-]+\.\w+', contact_text):
+            contact_score += 40
+        if re.search(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', contact_text):
+            contact_score += 30
+        if re.search(r'(linkedin|github)', contact_text, re.IGNORECASE):
+            contact_score += 30
+        scores['contact_info'] = contact_score
+
+        summary = document.get('summary')
+        if summary is None:
+            scores['summary'] = 0
+        elif 30 <= summary.word_count <= 120:
+            scores['summary'] = 90
+        elif summary.word_count > 0:
+            scores['summary'] = 60
+        else:
+            scores['summary'] = 20
+
+        experience = document.get('experience')
+        if experience is None:
+            scores['experience'] = 0
+        else:
+            # Whole-token matches, so 'led' no longer counts inside 'skilled'
+            verbs = len(self._action_verb_matcher.find(experience.tokens))
+            score = 40
+            score += min(verbs, 5) * 6
+            if self.bullet_pattern.search(experience.body):
+                score += 15
+            if self.metric_pattern.search(experience.body):
+                score += 15
+            scores['experience'] = min(score, 100)
+
+        education = document.get('education')
+        if education is None:
+            scores['education'] = 0
+        else:
+            score = 50
+            if re.search(r'(bachelor|master|phd|b\.?s\.?c?|m\.?s\.?c?|degree|diploma)', education.body, re.IGNORECASE):
+                score += 30
+            if re.search(r'(19|20)\d{2}', education.body):
+                score += 20
+            scores['education'] = score
+
+        skills = document.get('skills')
+        if skills is None:
+            scores['skills'] = 0
+        else:
+            found = len(self._skill_matcher.find(skills.tokens))
+            scores['skills'] = min(40 + found * 10, 100)
+
+        return scores
+
+    def calculate_ats_score(self, text: str, keywords: Dict[str, Any],
+                            structure: Optional[Dict[str, Any]] = None) -> int:
         """Calculate ATS compatibility score"""
         score = 0
         
@@ -121,7 +289,8 @@ class ResumeAnalyzer:
             score += 10
         
         # Standard sections (25 points)
-        structure = self.analyze_structure(text)
+        if structure is None:
+            structure = self.analyze_structure(text)
         score += structure['section_count'] * 5
         
         # Formatting indicators (20 points)
@@ -131,7 +300,7 @@ class ResumeAnalyzer:
             score += 10
         
         # Text length (15 points)
-        word_count = len(text.split())
+        word_count = structure['word_count']
         if 400 <= word_count <= 800:
             score += 15
         elif 300 <= word_count <= 1000:
@@ -177,76 +346,101 @@ class ResumeAnalyzer:
         try:
             # Extract text
             text = self.extract_text(file_path, file_type)
-            
-            # Perform various analyses
-            keywords = self.analyze_keywords(text)
-            structure = self.analyze_structure(text)
-            ats_score = self.calculate_ats_score(text, keywords)
-            recommendations = self.generate_recommendations(text, keywords, structure)
-            
-            # Calculate overall score
-            overall_score = int((
-                (len(keywords['technical_keywords']) * 3) +
-                (len(keywords['soft_skills']) * 2) +
-                (len(keywords['action_verbs']) * 2) +
-                (structure['section_count'] * 5) +
-                (ats_score * 0.3)
-            ) / 2)
-            
-            overall_score = min(max(overall_score, 0), 100)
-            
-            return {
-                'overall_score': overall_score,
-                'ats_compatibility': ats_score,
-                'keywords': {
-                    'technical': keywords['technical_keywords'],
-                    'soft_skills': keywords['soft_skills'],
-                    'action_verbs': keywords['action_verbs'],
-                    'total_count': keywords['keyword_count']
-                },
-                'structure': {
-                    'sections': structure['sections_present'],
-                    'word_count': structure['word_count'],
-                    'bullet_points': structure['bullet_points'],
-                    'has_metrics': structure['has_quantifiable_achievements']
-                },
-                'recommendations': recommendations,
-                'analysis_date': datetime.now().isoformat(),
-                'file_type': file_type
-            }
+            return self.analyze_text(text, file_type)
             
         except Exception as e:
             raise Exception(f"Resume analysis failed: {str(e)}")
 
-    def detailed_analysis(self, file_id: str) -> Dict[str, Any]:
-        """Perform detailed analysis on uploaded file"""
-        # This would be implemented to work with actual uploaded files
-        # For now, return enhanced mock data
+    def analyze_text(self, text: str, file_type: str, document: Optional[SegmentedDocument] = None) -> Dict[str, Any]:
+        """Run the structural and keyword analysis over already extracted text"""
+        # Segment once and share the sections across every analysis
+        if document is None:
+            document = segment(text)
+        
+        # Perform various analyses
+        keywords = self.analyze_keywords(text)
+        structure = self.analyze_structure(text, document)
+        section_scores = self.score_sections(document)
+        ats_score = self.calculate_ats_score(text, keywords, structure)
+        readability_scores = readability.score(text)
+        recommendations = self.generate_recommendations(text, keywords, structure)
+        if readability_scores['word_count'] and readability_scores['flesch_reading_ease'] < 30:
+            recommendations.append("Shorten long sentences and prefer simpler words to improve readability")
+        
+        # Calculate overall score
+        overall_score = int((
+            (len(keywords['technical_keywords']) * 3) +
+            (len(keywords['soft_skills']) * 2) +
+            (len(keywords['action_verbs']) * 2) +
+            (structure['section_count'] * 5) +
+            (ats_score * 0.3)
+        ) / 2)
+        
+        overall_score = min(max(overall_score, 0), 100)
+        
         return {
-            'overall_score': 85,
-            'ats_compatibility': 82,
-            'detailed_feedback': {
-                'strengths': [
-                    "Strong technical vocabulary",
-                    "Well-structured experience section",
-                    "Good use of action verbs"
-                ],
-                'weaknesses': [
-                    "Missing quantifiable achievements",
-                    "Could improve keyword density",
-                    "Add more recent technologies"
-                ]
+            'overall_score': overall_score,
+            'ats_compatibility': ats_score,
+            'keywords': {
+                'technical': keywords['technical_keywords'],
+                'soft_skills': keywords['soft_skills'],
+                'action_verbs': keywords['action_verbs'],
+                'total_count': keywords['keyword_count']
+            },
+            'structure': {
+                'sections': structure['sections_present'],
+                'word_count': structure['word_count'],
+                'bullet_points': structure['bullet_points'],
+                'has_metrics': structure['has_quantifiable_achievements'],
+                'segments': structure['segments']
             },
-            'section_scores': {
-                'contact_info': 95,
-                'summary': 78,
-                'experience': 85,
-                'education': 90,
-                'skills': 80
+            'section_scores': section_scores,
+            'readability': readability_scores,
+            'recommendations': recommendations,
+            'analysis_date': datetime.now().isoformat(),
+            'file_type': file_type
+        }
+
+    def detailed_analysis(self, analysis: Dict[str, Any], keyword_report: Dict[str, Any]) -> Dict[str, Any]:
+        """Build detailed feedback from a structural analysis and a keyword report"""
+        strengths = []
+        weaknesses = []
+        
+        if len(analysis['keywords']['technical']) >= 5:
+            strengths.append("Strong technical vocabulary")
+        else:
+            weaknesses.append("Could improve keyword density")
+        
+        if analysis['section_scores'].get('experience', 0) >= 70:
+            strengths.append("Well-structured experience section")
+        elif analysis['structure']['sections']['experience']:
+            weaknesses.append("Experience section could be more detailed")
+        else:
+            weaknesses.append("Missing a clear experience section")
+        
+        if len(analysis['keywords']['action_verbs']) >= 3:
+            strengths.append("Good use of action verbs")
+        else:
+            weaknesses.append("Use more action verbs")
+        
+        if analysis['structure']['has_metrics']:
+            strengths.append("Includes quantifiable achievements")
+        else:
+            weaknesses.append("Missing quantifiable achievements")
+        
+        found_keywords = list(analysis['keywords']['technical']) + list(analysis['keywords']['soft_skills'])
+        
+        return {
+            'overall_score': analysis['overall_score'],
+            'ats_compatibility': analysis['ats_compatibility'],
+            'detailed_feedback': {
+                'strengths': strengths,
+                'weaknesses': weaknesses
             },
+            'section_scores': analysis['section_scores'],
             'keyword_analysis': {
-                'found_keywords': ["Python", "JavaScript", "React", "SQL"],
-                'suggested_keywords': ["Node.js", "AWS", "Docker", "Git"],
-                'keyword_density': "Optimal"
+                'found_keywords': found_keywords,
+                'suggested_keywords': keyword_report['suggestions'],
+                'keyword_density': keyword_report['density_analysis']['density_rating']
             }
         }
@@ -0,0 +1,215 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from .tokenizer import token_spans, words
+
+
+# Canonical section names and the header spellings that map to them
+SECTION_ALIASES = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'executive summary',
+        'objective', 'career objective', 'profile', 'professional profile',
+        'about', 'about me'
+    ],
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'career history'
+    ],
+    'education': [
+        'education', 'academic background', 'academics', 'qualifications',
+        'education and training', 'academic qualifications'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+        'competencies', 'technologies', 'skills and abilities', 'technical expertise'
+    ],
+    'projects': [
+        'projects', 'personal projects', 'key projects', 'academic projects'
+    ],
+    'certifications': [
+        'certifications', 'certificates', 'licenses', 'licenses and certifications',
+        'certifications and licenses'
+    ],
+    'awards': ['awards', 'honors', 'achievements', 'awards and honors'],
+    'publications': ['publications', 'research'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests'],
+    'volunteer': ['volunteer', 'volunteering', 'volunteer experience'],
+    'references': ['references']
+}
+
+# Text before the first recognised header is treated as the contact block
+PREAMBLE_SECTION = 'contact'
+
+_HEADER_LOOKUP = {
+    alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases
+}
+_HEADER_STRIP_RE = re.compile(r'^[\s•·‣▪▫◦\-\*#]+|[\s:\-–—]+$')
+_HEADER_NORMALIZE_RE = re.compile(r'\s+')
+_UPPERCASE_HEADER_RE = re.compile(r'^[A-Z][A-Z\s&/]{2,}$')
+MAX_HEADER_LENGTH = 40
+# Inline headers: a known alias, then ':' or a spaced dash, then the first line of the body
+_INLINE_HEADER_RE = re.compile(
+    r'^[•·‣▪▫◦\*#\s]*([A-Za-z][A-Za-z &]{2,%d}?)\s*(?::|\s[-–—]|[–—])\s*(?=\S)' % MAX_HEADER_LENGTH)
+# Unknown all-caps lines only count as headers when short and free of sentence words,
+# so "REFERENCES AVAILABLE UPON REQUEST" stays body text
+MAX_OTHER_HEADER_WORDS = 3
+_SENTENCE_WORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'will', 'to', 'of', 'for', 'with', 'by',
+    'from', 'on', 'in', 'at', 'upon', 'available', 'request', 'my', 'our', 'your', 'i', 'we'
+}
+
+
+@dataclass
+class Section:
+    """A contiguous section of a resume with its offsets and slice of the shared, lowercased tokens"""
+    name: str
+    heading: str
+    start: int
+    body_start: int
+    end: int
+    token_start: int = 0
+    token_end: int = 0
+    body: str = ''
+    tokens: List[str] = field(default_factory=list)
+
+    @property
+    def word_count(self) -> int:
+        return len(words(self.tokens))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'heading': self.heading,
+            'start': self.start,
+            'end': self.end,
+            'word_count': self.word_count
+        }
+
+
+@dataclass
+class SegmentedDocument:
+    """Resume text split into sections, sharing a single token list"""
+    text: str
+    sections: List[Section]
+    tokens: List[str]
+
+    def get(self, name: str) -> Optional[Section]:
+        """Return the first section with the given canonical name"""
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def has(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def section_names(self) -> List[str]:
+        return [section.name for section in self.sections]
+
+    @property
+    def header_count(self) -> int:
+        return sum(1 for section in self.sections if section.heading)
+
+    @property
+    def word_count(self) -> int:
+        return len(words(self.tokens))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sections': [section.to_dict() for section in self.sections],
+            'header_count': self.header_count,
+            'word_count': self.word_count
+        }
+
+
+def _lookup(alias: str) -> Optional[str]:
+    return _HEADER_LOOKUP.get(_HEADER_NORMALIZE_RE.sub(' ', alias.lower().replace('&', 'and')))
+
+
+def match_header(line: str, in_preamble: bool = False) -> Optional[Tuple[str, int]]:
+    """Canonical section name of a header line and the offset in the line where its body starts
+
+    The offset is the line length for a header on a line of its own, and the
+    text after the separator for inline headers such as "Skills: Python, SQL".
+    """
+    stripped = _HEADER_STRIP_RE.sub('', line)
+    if len(stripped) < 3:
+        return None
+
+    if len(stripped) <= MAX_HEADER_LENGTH:
+        name = _lookup(stripped)
+        if name is not None:
+            return name, len(line)
+
+    inline = _INLINE_HEADER_RE.match(line)
+    if inline is not None:
+        name = _lookup(inline.group(1))
+        if name is not None:
+            return name, inline.end()
+
+    # Unknown all-caps lines count as headers once a section has started;
+    # in the preamble they are usually the candidate's name
+    if not in_preamble and len(stripped) <= MAX_HEADER_LENGTH and _UPPERCASE_HEADER_RE.match(stripped):
+        header_words = stripped.lower().split()
+        if len(header_words) <= MAX_OTHER_HEADER_WORDS and not _SENTENCE_WORDS.intersection(header_words):
+            return 'other', len(line)
+
+    return None
+
+
+def classify_header(line: str, in_preamble: bool = False) -> Optional[str]:
+    """Return the canonical section name if the line is, or starts with, a section header"""
+    match = match_header(line, in_preamble)
+    return match[0] if match is not None else None
+
+
+def segment(text: str) -> SegmentedDocument:
+    """Split resume text into sections in a single pass over its lines"""
+    sections: List[Section] = []
+    current = Section(name=PREAMBLE_SECTION, heading='', start=0, body_start=0, end=0)
+    in_preamble = True
+
+    position = 0
+    length = len(text)
+    while position < length:
+        newline = text.find('\n', position)
+        line_end = length if newline == -1 else newline
+        raw_line = text[position:line_end]
+        line = raw_line.strip()
+        header = match_header(line, in_preamble) if line else None
+        if header is not None:
+            name, body_offset = header
+            current.end = position
+            sections.append(current)
+            if body_offset >= len(line):
+                heading, body_start = line, min(line_end + 1, length)
+            else:
+                # Inline header: the rest of the line is the first line of the body
+                heading = line[:body_offset].strip()
+                body_start = position + (len(raw_line) - len(raw_line.lstrip())) + body_offset
+            current = Section(name=name, heading=heading, start=position, body_start=body_start, end=length)
+            in_preamble = False
+
+        position = line_end + 1
+
+    current.end = length
+    sections.append(current)
+
+    # Drop an empty preamble so documents that open with a header start cleanly
+    if sections[0].name == PREAMBLE_SECTION and not text[:sections[0].end].strip():
+        sections.pop(0)
+
+    # Tokenize once with the shared tokenizer and hand each section its slice of the
+    # token list; heading words are kept in the document tokens but not in the section slice
+    tokens: List[str] = []
+    for section in sections:
+        tokens.extend(match.group().lower() for match in token_spans(text, section.start, section.body_start))
+        section.body = text[section.body_start:section.end]
+        section.token_start = len(tokens)
+        tokens.extend(match.group().lower() for match in token_spans(text, section.body_start, section.end))
+        section.token_end = len(tokens)
+        section.tokens = tokens[section.token_start:section.token_end]
+
+    return SegmentedDocument(text=text, sections=sections, tokens=tokens)
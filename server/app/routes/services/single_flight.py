@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Tuple
+
+
+class FlightAbandoned(Exception):
+    """The leading call stopped before producing a result; waiters should retry"""
+
+
+class SingleFlight:
+    def __init__(self):
+        """Coalesce concurrent calls with the same key into a single computation"""
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def begin(self, key: str) -> Tuple[Future, bool]:
+        """Join the flight for a key; returns (future, True) if the caller must compute it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def finish(self, key: str, future: Future, result: Any = None, error: BaseException = None) -> None:
+        """Publish the leader's outcome to every waiter and close the flight"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """Run func once per key at a time; concurrent callers share its result"""
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.finish(key, future, error=e)
+            raise
+        except BaseException:
+            self.finish(key, future, error=FlightAbandoned(key))
+            raise
+
+        self.finish(key, future, result=result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'in_flight': len(self._calls), 'coalesced': self.coalesced}
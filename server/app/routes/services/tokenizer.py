@@ -0,0 +1,89 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+# Slash compounds that name one thing; every other a/b join (Python/Django, HTML/CSS) is split
+SLASH_COMPOUNDS = ['ci/cd', 'tcp/ip', 'ui/ux', 'pl/sql', 'i/o', 'a/b']
+
+# One precompiled pattern shared by every analyzer. It follows NLTK's Treebank
+# word tokenizer for ordinary prose and keeps tech tokens whole: c++, c#,
+# node.js, .net, ci/cd. Alternatives are tried in order at each position.
+_TOKEN_RE = re.compile(r"""
+    [a-z](?:\+\+|\#)(?![\w+#])                  # c++, c#, f#
+  | (?:%s)(?![\w/])                             # whitelisted slash compounds
+  | [a-z]+(?=n['’]t\b)                          # do|n't, ca|n't, is|n't
+  | n['’]t\b
+  | ['’](?:s|m|d|ll|re|ve)\b                    # clitics split off like NLTK: company|'s
+  | \d{1,3}(?:,\d{3})+(?:\.\d+)?                # 1,000 and 12,500.50
+  | \d+(?:/\d+)+                                # 05/2020
+  | \.?[a-z0-9]+(?:[.\-][a-z0-9]+)*\+*          # words, node.js, .net, well-known, 2019-2021, 300+
+    (?:\.(?=[ \t]+(?-i:[a-z])))?                # e.g. / Inc. keep their period when a lowercase word follows
+  | --
+  | \S
+""" % '|'.join(re.escape(compound) for compound in SLASH_COMPOUNDS), re.IGNORECASE | re.VERBOSE)
+
+_NEGATIONS = frozenset(["n't", "n’t"])
+
+TOKEN_CACHE_SIZE = 64
+
+
+def tokenize(text: str, lower: bool = True) -> List[str]:
+    """Split text into word and punctuation tokens; deterministic and needs no downloaded data"""
+    tokens = _TOKEN_RE.findall(text)
+    if lower:
+        return [token.lower() for token in tokens]
+    return tokens
+
+
+def token_spans(text: str, start: int = 0, end: Optional[int] = None) -> Iterator['re.Match']:
+    """Token matches with their offsets, optionally within text[start:end]"""
+    return _TOKEN_RE.finditer(text, start, len(text) if end is None else end)
+
+
+def is_word(token: str) -> bool:
+    """Tokens starting with a letter or digit (or the dot of .net); split-off n't is not a word of its own"""
+    first = token[:2].lstrip('.')[:1]
+    return first.isascii() and first.isalnum() and not (len(token) == 3 and token.lower() in _NEGATIONS)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def shared_tokens(text: str) -> Tuple[str, ...]:
+    """Lowercased tokens of a text, memoized so analyzers running over the same resume tokenize it once"""
+    return tuple(tokenize(text))
+
+
+def words(tokens: Iterable[str]) -> List[str]:
+    """Word tokens, without punctuation and split-off clitics, e.g. for word counts"""
+    return [token for token in tokens if is_word(token)]
+
+
+class TermMatcher:
+    def __init__(self, terms: Iterable[str]):
+        """Match single and multi-word terms on token boundaries, e.g. 'java' no longer matches 'javascript'"""
+        self.terms = list(dict.fromkeys(terms))
+        self._keys: Dict[Tuple[str, ...], str] = {}
+        for term in self.terms:
+            key = tuple(tokenize(term))
+            self._keys.setdefault(key, term)
+            # Plural of the last word counts too: apis, microservices
+            if key and key[-1].isalpha():
+                self._keys.setdefault(key[:-1] + (key[-1] + 's',), term)
+        self._lengths = sorted({len(key) for key in self._keys if key})
+
+    def counts(self, tokens: Sequence[str]) -> Counter:
+        """Occurrences of each term in a token sequence"""
+        tokens = tuple(tokens)
+        found = Counter()
+        for length in self._lengths:
+            for start in range(len(tokens) - length + 1):
+                term = self._keys.get(tokens[start:start + length])
+                if term is not None:
+                    found[term] += 1
+        return found
+
+    def find(self, tokens: Sequence[str]) -> List[str]:
+        """Terms present in the tokens, in the order they were given"""
+        found = self.counts(tokens)
+        return [term for term in self.terms if term in found]
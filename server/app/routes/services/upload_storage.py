@@ -0,0 +1,316 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+from .compressed_storage import open_artifact
+
+logger = logging.getLogger(__name__)
+
+# Filename suffix of every artifact kept per resume id
+ARTIFACT_SUFFIXES = {
+    'metadata': '_metadata.json',
+    'analysis': '_analysis.json',
+    'generated': '_generated_resume.json',
+    'signature': '_signature.json',
+    'text': '_text.txt'
+}
+ORIGINAL_ARTIFACT = 'original'
+
+DAY = 24 * 60 * 60
+DEFAULT_RETENTION_TTLS = {
+    'original': 90 * DAY,
+    'metadata': 90 * DAY,
+    'analysis': 90 * DAY,
+    'generated': 30 * DAY,
+    'signature': 90 * DAY,
+    'text': 90 * DAY
+}
+
+# Ids are lowercase uuid4 strings; the first four characters name the shard directories
+_FILE_ID_RE = re.compile(r'^[0-9a-f]{4}[0-9a-f-]{4,60}$')
+_SHARD_RE = re.compile(r'^[0-9a-f]{2}$')
+
+
+def artifact_name(file_id: str, artifact: str, extension: str = '') -> str:
+    """Stored filename of an artifact, e.g. <id>_analysis.json or <id>.pdf"""
+    if artifact == ORIGINAL_ARTIFACT:
+        return f"{file_id}.{extension}"
+    return f"{file_id}{ARTIFACT_SUFFIXES[artifact]}"
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def classify_name(name: str) -> Optional[Dict[str, str]]:
+    """Split a stored filename into its file id and artifact type"""
+    for artifact, suffix in ARTIFACT_SUFFIXES.items():
+        if name.endswith(suffix):
+            file_id = name[:-len(suffix)]
+            break
+    else:
+        file_id, dot, _ = name.partition('.')
+        if not dot:
+            return None
+        artifact = ORIGINAL_ARTIFACT
+
+    if not _FILE_ID_RE.match(file_id):
+        return None
+    return {'file_id': file_id, 'artifact': artifact}
+
+
+class UploadStorage:
+    def __init__(self, root: str = 'uploads'):
+        """Sharded upload layout: <root>/<id[0:2]>/<id[2:4]>/<id>...
+
+        Files written before sharding stay readable from the flat root until
+        migrate() moves them, so resharding needs no downtime.
+        """
+        self.root = root
+        self.retention_ttls = dict(DEFAULT_RETENTION_TTLS)
+        self.sweep_interval = 60 * 60
+
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._usage_lock = threading.Lock()
+        # Set once a scan has computed usage from disk; until then usage() scans on demand
+        self._usage_scanned = threading.Event()
+        self._delete_listeners: List[Callable[[str, str], None]] = []
+        self._sweep_listeners: List[Callable[[float], Any]] = []
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_sweep: Optional[Dict[str, Any]] = None
+
+    def init_app(self, app) -> None:
+        """Read the upload folder and retention settings from the Flask app config"""
+        self.root = app.config.get('UPLOAD_FOLDER', self.root)
+        self.retention_ttls.update(app.config.get('RETENTION_TTLS', {}))
+        self.sweep_interval = app.config.get('RETENTION_SWEEP_INTERVAL', self.sweep_interval)
+        os.makedirs(self.root, exist_ok=True)
+
+    def on_delete(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback(file_id, path) run after the sweeper deletes a file"""
+        self._delete_listeners.append(listener)
+
+    def on_sweep(self, listener: Callable[[float], Any]) -> None:
+        """Register a callback(now) run after each retention sweep, for caches kept outside the artifact layout"""
+        self._sweep_listeners.append(listener)
+
+    # Paths
+
+    def shard_dir(self, file_id: str) -> str:
+        self._check_id(file_id)
+        return os.path.join(self.root, file_id[0:2], file_id[2:4])
+
+    def path_for(self, file_id: str, name: str) -> str:
+        """Path to write a file to, creating its shard directory
+
+        A file still in the flat layout is overwritten in place, so a later
+        migrate() can never replace newer sharded data with a stale copy.
+        """
+        directory = self.shard_dir(file_id)
+        legacy = os.path.join(self.root, name)
+        if os.path.exists(legacy):
+            return legacy
+
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    def locate(self, file_id: str, name: str) -> str:
+        """Path of an existing file, in the legacy flat layout or its shard
+
+        The legacy copy wins: path_for() keeps writing there until migrate()
+        moves it over the sharded one, so a sharded copy next to it is stale.
+        """
+        sharded = os.path.join(self.shard_dir(file_id), name)
+        legacy = os.path.join(self.root, name)
+        if os.path.exists(legacy):
+            return legacy
+
+        # Either never in the flat layout, or migrate() has moved it since
+        return sharded
+
+    def artifact_path(self, file_id: str, artifact: str) -> str:
+        return self.locate(file_id, artifact_name(file_id, artifact))
+
+    def iter_artifacts(self, artifact: str):
+        """Yield (file_id, path) for every stored artifact of one type, in either layout"""
+        for directory in self._directories():
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    parsed = classify_name(entry.name)
+                    if parsed is not None and parsed['artifact'] == artifact:
+                        yield parsed['file_id'], entry.path
+
+    # Disk usage accounting
+
+    @contextmanager
+    def tracking(self, user_id: str, path: str):
+        """Charge the size change of a file written inside the block to a user"""
+        before = self._size(path)
+        yield path
+        self._charge(user_id, self._size(path) - before, 0 if before else 1)
+
+    def usage(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        if not self._usage_scanned.is_set():
+            self.sweep(expire=False)
+        with self._usage_lock:
+            if user_id is not None:
+                return dict(self._usage.get(user_id, {'bytes': 0, 'files': 0}))
+            return {
+                'users': {user: dict(totals) for user, totals in self._usage.items()},
+                'total_bytes': sum(totals['bytes'] for totals in self._usage.values()),
+                'total_files': sum(totals['files'] for totals in self._usage.values())
+            }
+
+    def _charge(self, user_id: str, size_delta: int, file_delta: int) -> None:
+        with self._usage_lock:
+            totals = self._usage.setdefault(user_id, {'bytes': 0, 'files': 0})
+            totals['bytes'] += size_delta
+            totals['files'] += file_delta
+
+    # Migration
+
+    def migrate(self) -> Dict[str, int]:
+        """Move flat-layout files into their shards one atomic rename at a time"""
+        moved = skipped = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                parsed = classify_name(entry.name)
+                if parsed is None:
+                    skipped += 1
+                    continue
+                directory = self.shard_dir(parsed['file_id'])
+                os.makedirs(directory, exist_ok=True)
+                os.replace(entry.path, os.path.join(directory, entry.name))
+                moved += 1
+        return {'moved': moved, 'skipped': skipped}
+
+    # Retention
+
+    def start_sweeper(self) -> None:
+        if not self.sweep_interval:
+            return
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='retention-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+
+    def sweep(self, now: Optional[float] = None, expire: bool = True) -> Dict[str, Any]:
+        """Delete artifacts past their TTL and recompute per-user disk usage; expire=False only counts usage"""
+        now = time.time() if now is None else now
+        deleted = {artifact: 0 for artifact in self.retention_ttls}
+        freed = 0
+        usage: Dict[str, Dict[str, int]] = {}
+
+        for directory in self._directories():
+            groups: Dict[str, List[Any]] = {}
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    parsed = classify_name(entry.name)
+                    if parsed is not None:
+                        groups.setdefault(parsed['file_id'], []).append((entry, parsed['artifact']))
+
+            for file_id, files in groups.items():
+                owner = self._owner(directory, file_id, files)
+                for entry, artifact in files:
+                    stat = entry.stat()
+                    ttl = self.retention_ttls.get(artifact)
+                    if expire and ttl and now - stat.st_mtime > ttl:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            continue
+                        deleted[artifact] = deleted.get(artifact, 0) + 1
+                        freed += stat.st_size
+                        for listener in self._delete_listeners:
+                            listener(file_id, entry.path)
+                        continue
+
+                    totals = usage.setdefault(owner, {'bytes': 0, 'files': 0})
+                    totals['bytes'] += stat.st_size
+                    totals['files'] += 1
+
+        with self._usage_lock:
+            self._usage = usage
+        self._usage_scanned.set()
+
+        if not expire:
+            return {'finished_at': now, 'deleted': deleted, 'bytes_freed': 0}
+        for listener in self._sweep_listeners:
+            listener(now)
+        self.last_sweep = {
+            'finished_at': now,
+            'deleted': deleted,
+            'bytes_freed': freed
+        }
+        return self.last_sweep
+
+    def _sweep_loop(self) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception('Retention sweep failed')
+            if self._stop.wait(self.sweep_interval):
+                return
+
+    def _directories(self):
+        """The flat root followed by every <aa>/<bb> shard directory"""
+        if not os.path.isdir(self.root):
+            return
+        yield self.root
+        with os.scandir(self.root) as level_one:
+            for first in level_one:
+                if not (first.is_dir() and _SHARD_RE.match(first.name)):
+                    continue
+                with os.scandir(first.path) as level_two:
+                    for second in level_two:
+                        if second.is_dir() and _SHARD_RE.match(second.name):
+                            yield second.path
+
+    def _owner(self, directory: str, file_id: str, files: List[Any]) -> str:
+        """User id recorded in the metadata or generated resume of a file id"""
+        artifacts = {artifact for _, artifact in files}
+        for artifact in ('metadata', 'generated'):
+            if artifact not in artifacts:
+                continue
+            try:
+                with open_artifact(os.path.join(directory, artifact_name(file_id, artifact))) as f:
+                    return json.load(f).get('user_id', 'anonymous')
+            except (OSError, ValueError):
+                continue
+        return 'anonymous'
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _check_id(file_id: str) -> None:
+        # Ids come straight from URLs, so reject anything that could escape the root
+        if not _FILE_ID_RE.match(file_id or ''):
+            raise FileNotFoundError('File not found')
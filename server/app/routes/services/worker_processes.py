@@ -0,0 +1,35 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+
+# Task modules imported once by the fork server; every worker forked from it starts with them
+# loaded. __main__ stays out: the fork server must not re-run the entry script or build the app.
+_preload: List[str] = []
+_preload_lock = threading.Lock()
+
+
+def worker_context(*modules: str):
+    """Multiprocessing context for the CPU-bound worker pools
+
+    Plain fork is unsafe in the threaded server. A fork server imports the
+    task modules (and their PDF libraries) once and forks every worker from
+    that interpreter. Where fork servers are unavailable (Windows) this falls
+    back to spawn.
+    """
+    with _preload_lock:
+        for module in modules:
+            if module not in _preload:
+                _preload.append(module)
+        if 'forkserver' not in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('spawn')
+        context = multiprocessing.get_context('forkserver')
+        # Only read when the fork server starts, i.e. before the first worker of any pool
+        context.set_forkserver_preload(list(_preload))
+        return context
+
+
+def warm_pool(pool: ProcessPoolExecutor, workers: int) -> None:
+    """Start the pool's workers now instead of on the first request that needs them"""
+    list(pool.map(abs, range(workers)))
@@ -0,0 +1,81 @@
+"""Entity extraction throughput in documents per second.
+
+Compares one nlp() call per document with nlp.pipe batching at several batch
+sizes, using the offline blank pipeline and EntityRuler patterns from
+routes/services/entity_extractor.py. Pipeline load time is reported separately
+since each worker pays it once.
+
+Usage (from the server directory):
+    python benchmarks/entities.py [--docs N] [--batch-sizes 8,32,128] [--model NAME]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from routes.services.entity_extractor import EntityExtractor, KNOWN_COMPANIES
+
+
+TITLES = ['Senior Software Engineer', 'Data Analyst', 'Product Manager', 'Lead Frontend Developer',
+          'Director of Engineering', 'Machine Learning Engineer', 'QA Engineer']
+COMPANIES = KNOWN_COMPANIES[:12] + ['Acme Widget Corp', 'Initech Solutions', 'Globex Technologies']
+DEGREES = ['B.S. in Computer Science', 'Master of Science in Data Science', 'MBA', 'Ph.D. in Physics']
+SCHOOLS = ['University of Michigan', 'Stanford University', 'Georgia Institute of Technology']
+BULLETS = ['Developed scalable microservices and reduced latency by 35%',
+           'Led a team of 6 engineers delivering customer-facing features',
+           'Automated deployment pipelines with Docker and Kubernetes',
+           'Collaborated with stakeholders to define product requirements']
+
+
+def make_resume(rng):
+    lines = ['Jane Doe', 'jane.doe@example.com | (555) 123-4567', 'EXPERIENCE']
+    year = rng.randint(2005, 2015)
+    for _ in range(rng.randint(2, 5)):
+        end = year + rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | Jan {year} - Mar {end}")
+        lines.extend('• ' + bullet for bullet in rng.sample(BULLETS, 3))
+        year = end
+    lines.append('EDUCATION')
+    lines.append(f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}, {year - 14}-{year - 10}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--batch-sizes', default='8,32,128')
+    parser.add_argument('--model', default=None, help='trained spaCy model instead of the blank pipeline')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_resume(rng) for _ in range(args.docs)]
+    extractor = EntityExtractor(model=args.model)
+
+    start = time.perf_counter()
+    nlp = extractor.nlp
+    print(f"pipeline {nlp.pipe_names} loaded in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    print(f"{args.docs} documents, ~{sum(len(doc) for doc in docs) // args.docs} chars each")
+
+    start = time.perf_counter()
+    single = [extractor.extract(doc) for doc in docs]
+    elapsed = time.perf_counter() - start
+    print(f"  one call per doc:  {args.docs / elapsed:>9.1f} docs/s")
+
+    for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+        start = time.perf_counter()
+        batched = extractor.extract_batch(docs, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        assert batched == single, 'batched extraction must match per-document extraction'
+        print(f"  nlp.pipe batch {batch_size:<4} {args.docs / elapsed:>9.1f} docs/s")
+
+    found = sum(len(result['entities']) for result in single)
+    print(f"  {found / args.docs:.1f} entities per document")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
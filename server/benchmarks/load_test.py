@@ -0,0 +1,420 @@
+"""Load generator for the upload -> analyze -> results flow.
+
+Drives the real Flask app either in process (through its test client, with
+uploads in a temporary directory) or over HTTP against a running server. It
+uses locally generated PDF and DOCX fixtures, salted with a per-upload token so
+every upload is a distinct document, sends a weighted mix of uploads,
+/api/analyze (of fresh uploads first), /api/results polling and the resume
+blueprint keyword/ATS routes with Poisson arrivals, and reports throughput,
+error rate and p50/p95/p99 latency per route. Analyze calls are reported as
+real analyses of fresh uploads, reuse hits (an exact duplicate's analysis
+served) and repeat calls on already analyzed ids. Requests are spread across
+--users synthetic user ids so per-user admission quotas do not cap the run,
+and admission rejections (429/503) are counted apart from errors. With
+several --rates the rate is stepped up and the first step that misses the
+offered load, the p99 SLO, the error budget or the rejection budget is
+reported as the saturation point.
+
+Usage (from the server directory):
+    python benchmarks/load_test.py --rates 5,10,20,40 --concurrency 16 --duration 20
+    python benchmarks/load_test.py --url http://localhost:5000 --rates 10
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+DEFAULT_MIX = {
+    'upload': 10,
+    'analyze': 15,
+    'results': 45,
+    'keywords': 15,
+    'ats': 15
+}
+
+JOB_DESCRIPTION = "Senior Python developer with React, SQL and project management experience"
+
+RESUME_LINES = [
+    "PROFESSIONAL SUMMARY",
+    "Software engineer with 6+ years building web platforms in Python and JavaScript.",
+    "EXPERIENCE",
+    "Senior Developer - Acme Corp (2020-2024)",
+    "• Developed microservices in Python and Node.js serving 2M requests per day",
+    "• Led a team of 5 engineers and improved deployment frequency by 40%",
+    "• Implemented CI/CD pipelines with Docker, Kubernetes and AWS",
+    "Developer - Beta Systems (2017-2020)",
+    "• Built React dashboards and optimized PostgreSQL queries, reducing latency by 30%",
+    "EDUCATION",
+    "Bachelor of Science in Computer Science - State University, 2017",
+    "SKILLS",
+    "Python, JavaScript, React, SQL, Git, Docker, AWS, leadership, communication"
+]
+
+# Fixed-width stand-in that salt() swaps for a per-upload token of the same length
+SALT_PLACEHOLDER = 'ref-0000000000000000'
+
+
+# Fixtures
+
+def make_pdf(pages: int, seed: int, salted: bool = False) -> bytes:
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    # A salted fixture keeps its page streams uncompressed so salt() can rewrite the placeholder in place
+    pdf = canvas.Canvas(buffer, pagesize=LETTER, pageCompression=0 if salted else None)
+    for page in range(pages):
+        y = 740
+        if page == 0:
+            pdf.drawString(54, y, f"Candidate {seed}  candidate{seed}@example.com  (555) 123-{seed % 10000:04d}")
+            y -= 24
+            if salted:
+                pdf.drawString(54, y, f"Reference {SALT_PLACEHOLDER}")
+                y -= 24
+        for _ in range(3):
+            for line in RESUME_LINES:
+                pdf.drawString(54, y, line if rng.random() > 0.1 else line.lower())
+                y -= 16
+                if y < 60:
+                    break
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def make_docx(seed: int, salted: bool = False) -> bytes:
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {seed}  candidate{seed}@example.com  (555) 123-{seed % 10000:04d}")
+    if salted:
+        document.add_paragraph(f"Reference {SALT_PLACEHOLDER}")
+    for line in RESUME_LINES:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_fixtures(count: int):
+    fixtures = []
+    for i in range(count):
+        if i % 3 == 2:
+            fixtures.append((f"resume_{i}.docx", make_docx(i, salted=True)))
+        else:
+            fixtures.append((f"resume_{i}.pdf", make_pdf(1 + i % 3, i, salted=True)))
+    return fixtures
+
+
+def salt(fixture, rng):
+    """Copy of a salted fixture with a random token in place of the placeholder, so no two uploads match"""
+    name, content = fixture
+    placeholder = SALT_PLACEHOLDER.encode('ascii')
+    token = f"ref-{rng.getrandbits(64):016x}".encode('ascii')
+    if name.endswith('.pdf'):
+        # Same length, so the xref offsets stay valid
+        return name, content.replace(placeholder, token)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(content)) as source, \
+            zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename == 'word/document.xml':
+                data = data.replace(placeholder, token)
+            target.writestr(item, data)
+    return name, buffer.getvalue()
+
+
+# Clients
+
+class InProcessClient:
+    def __init__(self):
+        """Import the app inside a scratch directory so uploads never touch the real tree"""
+        self.workdir = tempfile.mkdtemp(prefix='skillsync-load-')
+        os.chdir(self.workdir)
+        sys.path.insert(0, os.path.abspath(APP_DIR))
+        import main
+
+        self.app = main.app
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+
+    def request(self, method, path, json_body=None, upload=None, form=None, user_id=None):
+        kwargs = {'headers': {'X-User-Id': user_id}} if user_id else {}
+        if json_body is not None:
+            kwargs['json'] = json_body
+        if upload is not None:
+            name, content = upload
+            kwargs['data'] = dict(form or {}, file=(io.BytesIO(content), name))
+            kwargs['content_type'] = 'multipart/form-data'
+        response = self._client().open(path, method=method, **kwargs)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.requests.Session()
+        return session
+
+    def request(self, method, path, json_body=None, upload=None, form=None, user_id=None):
+        kwargs = {'timeout': 60}
+        if user_id:
+            kwargs['headers'] = {'X-User-Id': user_id}
+        if json_body is not None:
+            kwargs['json'] = json_body
+        if upload is not None:
+            kwargs['files'] = {'file': upload}
+            kwargs['data'] = form or {}
+        response = self._session().request(method, self.base_url + path, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+
+# Traffic
+
+REJECTED_STATUSES = {429, 503}
+
+
+class Workload:
+    def __init__(self, client, fixtures, mix, users=1):
+        self.client = client
+        self.fixtures = fixtures
+        # Synthetic callers, so per-user admission quotas do not cap the whole run
+        self.users = [f"load-test-{i}" for i in range(max(users, 1))]
+        self.routes = list(mix)
+        self.weights = [mix[route] for route in self.routes]
+        self.analyzed = []
+        # Uploaded but not yet analyzed; the analyze route takes these first
+        self.uploaded = []
+        self.lock = threading.Lock()
+
+    def seed(self, count):
+        """Upload and analyze a few files so polling routes have ids to hit"""
+        rng = random.Random(count)
+        for i in range(count):
+            user_id = self.users[i % len(self.users)]
+            file_id = self.upload(salt(self.fixtures[i % len(self.fixtures)], rng), user_id)
+            self.client.request('GET', f'/api/analyze/{file_id}', user_id=user_id)
+            with self.lock:
+                self.analyzed.append(file_id)
+
+    def upload(self, fixture, user_id):
+        status, body = self.client.request('POST', '/api/upload', upload=fixture, form={'userId': user_id})
+        if status != 200:
+            raise RuntimeError(f"upload failed with {status}: {body}")
+        return body['file_id']
+
+    def pick(self, rng):
+        return rng.choices(self.routes, weights=self.weights)[0]
+
+    def run(self, route, rng):
+        """Issue one request and return (label it is reported under, status code)"""
+        with self.lock:
+            file_id = rng.choice(self.analyzed)
+        user_id = rng.choice(self.users)
+
+        if route == 'upload':
+            status, body = self.client.request('POST', '/api/upload', upload=salt(rng.choice(self.fixtures), rng),
+                                               form={'userId': user_id})
+            if status == 200:
+                with self.lock:
+                    self.uploaded.append(body['file_id'])
+            return route, status
+        if route == 'analyze':
+            # Fresh uploads are analyzed here so the pool of pollable ids keeps growing
+            with self.lock:
+                fresh = self.uploaded.pop() if self.uploaded else None
+            if fresh is None:
+                # Nothing new to analyze; this only measures the cached path
+                return 'analyze_repeat', self.client.request('GET', f'/api/analyze/{file_id}', user_id=user_id)[0]
+            status, body = self.client.request('GET', f'/api/analyze/{fresh}', user_id=user_id)
+            if status != 200:
+                return route, status
+            with self.lock:
+                self.analyzed.append(fresh)
+            # Served from an exact duplicate's analysis instead of extracting the file
+            reused = ((body or {}).get('analysis') or {}).get('duplicates', {}).get('reused')
+            return ('analyze_reused' if reused else route), status
+        if route == 'results':
+            return route, self.client.request('GET', f'/api/results/{file_id}', user_id=user_id)[0]
+        if route == 'keywords':
+            return route, self.client.request('POST', '/api/resume/keywords', json_body={'fileId': file_id},
+                                              user_id=user_id)[0]
+        if route == 'ats':
+            return route, self.client.request('POST', '/api/resume/ats-check',
+                                              json_body={'fileId': file_id, 'jobDescription': JOB_DESCRIPTION},
+                                              user_id=user_id)[0]
+        raise ValueError(f"Unknown route: {route}")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_step(workload, rate, concurrency, duration, seed):
+    """Open-loop run: Poisson arrivals at `rate`/s, latency measured from the scheduled arrival"""
+    rng = random.Random(seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    rejected = defaultdict(int)
+    record_lock = threading.Lock()
+
+    def task(route, scheduled, task_seed):
+        task_rng = random.Random(task_seed)
+        try:
+            route, status = workload.run(route, task_rng)
+        except Exception:
+            status = None
+        elapsed = time.perf_counter() - scheduled
+        with record_lock:
+            latencies[route].append(elapsed)
+            # Load shedding by admission control is reported apart from failures
+            if status in REJECTED_STATUSES:
+                rejected[route] += 1
+            elif status is None or status >= 400:
+                errors[route] += 1
+
+    start = time.perf_counter()
+    next_arrival = start
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - start > duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(task, workload.pick(rng), next_arrival, rng.random())
+            sent += 1
+    elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        routes[route] = {
+            'requests': len(values),
+            'errors': errors[route],
+            'rejected': rejected[route],
+            'p50_ms': round(percentile(values, 50) * 1000, 1),
+            'p95_ms': round(percentile(values, 95) * 1000, 1),
+            'p99_ms': round(percentile(values, 99) * 1000, 1)
+        }
+
+    completed = sum(len(values) for values in latencies.values())
+    all_values = sorted(v for values in latencies.values() for v in values)
+    return {
+        'offered_rate': rate,
+        'arrival_rate': round(sent / duration, 2),
+        'sent': sent,
+        'completed': completed,
+        'throughput': round(completed / elapsed, 2),
+        'error_rate': round(sum(errors.values()) / completed, 4) if completed else 0.0,
+        'rejection_rate': round(sum(rejected.values()) / completed, 4) if completed else 0.0,
+        'p99_ms': round(percentile(all_values, 99) * 1000, 1),
+        'routes': routes
+    }
+
+
+def is_saturated(step, slo_ms, max_error_rate, max_rejection_rate):
+    # Compare against the arrivals actually generated, not the nominal Poisson rate
+    return (step['throughput'] < 0.9 * step['arrival_rate']
+            or step['p99_ms'] > slo_ms
+            or step['error_rate'] > max_error_rate
+            or step['rejection_rate'] > max_rejection_rate)
+
+
+def print_step(step):
+    print(f"\nOffered {step['offered_rate']}/s ({step['arrival_rate']}/s arrived) -> {step['throughput']}/s completed, "
+          f"error rate {step['error_rate']:.2%}, rejected {step['rejection_rate']:.2%}, "
+          f"overall p99 {step['p99_ms']} ms")
+    print(f"  {'route':<16}{'requests':>10}{'errors':>8}{'rejected':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in step['routes'].items():
+        print(f"  {route:<16}{stats['requests']:>10}{stats['errors']:>8}{stats['rejected']:>10}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server; omit to drive the app in process')
+    parser.add_argument('--rates', default='5,10,20', help='Comma-separated arrival rates (requests/s) to step through')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum requests in flight')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per rate step')
+    parser.add_argument('--mix', default=','.join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help='Route weights, e.g. upload=10,analyze=15,results=45,keywords=15,ats=15')
+    parser.add_argument('--fixtures', type=int, default=6, help='Number of generated PDF/DOCX fixtures')
+    parser.add_argument('--seed-files', type=int, default=4, help='Files uploaded and analyzed before the run')
+    parser.add_argument('--slo-ms', type=float, default=1000, help='p99 latency that counts as saturated')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--max-rejection-rate', type=float, default=0.05,
+                        help='Share of 429/503 admission rejections that counts as saturated')
+    parser.add_argument('--users', type=int, default=50, help='Synthetic user ids the requests are spread across')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    mix = {}
+    for item in args.mix.split(','):
+        route, _, weight = item.partition('=')
+        mix[route.strip()] = float(weight)
+
+    client = HttpClient(args.url) if args.url else InProcessClient()
+    workload = Workload(client, build_fixtures(args.fixtures), mix, users=args.users)
+    workload.seed(args.seed_files)
+
+    steps = []
+    saturation = None
+    for i, rate in enumerate(float(r) for r in args.rates.split(',')):
+        step = run_step(workload, rate, args.concurrency, args.duration, seed=i)
+        steps.append(step)
+        if not args.json:
+            print_step(step)
+        if is_saturated(step, args.slo_ms, args.max_error_rate, args.max_rejection_rate):
+            saturation = rate
+            break
+
+    if args.json:
+        print(json.dumps({'steps': steps, 'saturation_rate': saturation}, indent=2))
+    elif saturation is None:
+        print(f"\nNo saturation up to {steps[-1]['offered_rate']}/s")
+    else:
+        print(f"\nSaturated at {saturation}/s (last healthy step: "
+              f"{steps[-2]['offered_rate'] if len(steps) > 1 else 'none'}/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
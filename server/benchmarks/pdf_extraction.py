@@ -0,0 +1,71 @@
+"""Serial vs page-range parallel PDF text extraction latency.
+
+Generates PDFs of increasing length and extracts each one twice. The first
+pass walks every page in one thread. The second splits the pages into
+ranges and extracts them across the process pool, as
+ResumeAnalyzer.extract_pdf_ranges does for PDFs at or above
+PDF_PARALLEL_MIN_PAGES. Both passes must produce identical text. Worker
+start-up is paid once per server and is reported separately. The crossover
+page count shows where the threshold belongs on a given machine.
+
+Usage (from the server directory):
+    python benchmarks/pdf_extraction.py [--pages 4,8,16,32,50] [--workers N] [--repeat N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from load_test import make_pdf
+from routes.services.resume_analyzer import extract_page_range, get_page_pool, page_ranges, ResumeAnalyzer
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default='4,8,16,32,50')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    analyzer = ResumeAnalyzer()
+    analyzer.pdf_workers = args.workers
+    directory = tempfile.mkdtemp(prefix='pdf-bench-')
+    try:
+        start = time.perf_counter()
+        pool = get_page_pool(args.workers)
+        list(pool.map(abs, range(args.workers)))
+        print(f"{args.workers} workers on {os.cpu_count()} CPUs, pool started in "
+              f"{(time.perf_counter() - start) * 1e3:.0f} ms")
+        print(f"  {'pages':<7}{'ranges':>7}{'serial ms':>11}{'parallel ms':>13}{'speedup':>9}")
+
+        for pages in [int(count) for count in args.pages.split(',')]:
+            path = os.path.join(directory, f"{pages}.pdf")
+            with open(path, 'wb') as f:
+                f.write(make_pdf(pages, pages))
+
+            serial, serial_time = best_of(args.repeat, lambda: extract_page_range(path, 0, pages))
+            parallel, parallel_time = best_of(args.repeat, lambda: analyzer.extract_pdf_ranges(path, pages))
+            assert parallel == serial, 'parallel extraction must reassemble pages in order'
+
+            print(f"  {pages:<7}{len(page_ranges(pages, args.workers)):>7}{serial_time * 1e3:>11.1f}"
+                  f"{parallel_time * 1e3:>13.1f}{serial_time / parallel_time:>8.2f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Readability scoring throughput: textstat per-metric calls vs the engine.
+
+textstat re-tokenizes the text and recounts syllables for every metric; the
+engine in routes/services/readability.py tokenizes once and counts each word's
+syllables through a process-wide cache. Metric values are printed side by
+side; they differ slightly because the engine also treats line breaks as
+sentence boundaries. The comparison needs textstat and the NLTK cmudict
+corpus newer textstat releases read; the run fails when either is missing.
+
+Usage (from the server directory):
+    python benchmarks/readability.py [--docs N] [--seed N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from routes.services import readability
+
+
+VOCABULARY = (
+    'developed implemented managed designed optimized scalable microservices architecture '
+    'collaborated cross-functional teams deliver customer-facing features reduced latency '
+    'improved reliability infrastructure automated deployment pipelines mentored engineers '
+    'analyzed requirements stakeholders documentation python javascript react node.js '
+    'postgresql kubernetes docker aws monitoring observability performance testing '
+    'the a and of to for with on in by across within using while'
+).split()
+
+HEADERS = ['SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS']
+
+
+def make_resume(rng):
+    lines = ['Jane Doe', 'jane.doe@example.com | (555) 123-4567 | linkedin.com/in/janedoe']
+    for header in HEADERS:
+        lines.append(header)
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(VOCABULARY, k=rng.randint(6, 22))
+            line = '• ' + ' '.join(words).capitalize()
+            lines.append(line + ('.' if rng.random() < 0.5 else ''))
+    return '\n'.join(lines)
+
+
+def textstat_scores(textstat, text):
+    return {
+        'flesch_reading_ease': textstat.flesch_reading_ease(text),
+        'flesch_kincaid_grade': textstat.flesch_kincaid_grade(text),
+        'gunning_fog': textstat.gunning_fog(text),
+        'smog_index': textstat.smog_index(text),
+        'coleman_liau_index': textstat.coleman_liau_index(text),
+        'automated_readability_index': textstat.automated_readability_index(text)
+    }
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_resume(rng) for _ in range(args.docs)]
+
+    readability.syllable_count.cache_clear()
+    _, cold = timed(lambda: [readability.score(doc) for doc in docs])
+    engine, warm = timed(lambda: [readability.score(doc) for doc in docs])
+
+    print(f"{args.docs} documents")
+    print(f"  engine, cold cache:  {args.docs / cold:>9.1f} docs/s ({cold / args.docs * 1e3:.2f} ms/doc)")
+    print(f"  engine, warm cache:  {args.docs / warm:>9.1f} docs/s ({warm / args.docs * 1e3:.2f} ms/doc)")
+    print(f"  syllable cache:      {readability.syllable_count.cache_info()}")
+
+    try:
+        import textstat
+        baseline, elapsed = timed(lambda: [textstat_scores(textstat, doc) for doc in docs])
+    except (ImportError, LookupError) as e:
+        # Newer textstat releases need the NLTK cmudict corpus: nltk.download('cmudict')
+        print(f"textstat comparison failed, no baseline to compare against: {type(e).__name__}: {e}",
+              file=sys.stderr)
+        return 1
+
+    print(f"  textstat, 6 metrics: {args.docs / elapsed:>9.1f} docs/s ({elapsed / args.docs * 1e3:.2f} ms/doc)")
+    print(f"  speedup (warm):      {elapsed / warm:>9.1f}x")
+
+    print("\nMean metric values (textstat -> engine):")
+    for metric in baseline[0]:
+        before = sum(scores[metric] for scores in baseline) / len(baseline)
+        after = sum(scores[metric] for scores in engine) / len(engine)
+        print(f"  {metric:<28} {before:>7.2f} -> {after:>7.2f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Bytes and serialization time for stored analyses and /api/results payloads.
+
+Compares the previous encoding (indent=2 on disk, full uncompressed response)
+with compact on-disk JSON, gzip/br response compression and ?fields= projection.
+
+Usage (from the server directory):
+    python benchmarks/results_payload.py [uploads_dir] [--repeat N]
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from routes.services.response_utils import brotli, project_fields, parse_fields, GZIP_LEVEL, BROTLI_QUALITY
+
+
+SCORES_ONLY = 'overall_score,ats_compatibility,section_scores'
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('uploads_dir', nargs='?', default='uploads')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.uploads_dir, '*_analysis.json')))
+    if not paths:
+        print(f"No *_analysis.json files found in {args.uploads_dir}")
+        return 1
+
+    rows = []
+    for path in paths:
+        with open(path, 'r') as f:
+            analysis = json.load(f)
+        envelope = {'file_id': os.path.basename(path).split('_')[0], 'analysis': analysis}
+
+        pretty, pretty_us = timed(lambda: json.dumps(analysis, indent=2), args.repeat)
+        compact, compact_us = timed(lambda: json.dumps(analysis, separators=(',', ':'), ensure_ascii=False), args.repeat)
+        _, load_pretty_us = timed(lambda: json.loads(pretty), args.repeat)
+        _, load_compact_us = timed(lambda: json.loads(compact), args.repeat)
+
+        # jsonify output (compact outside debug mode) for the full poll response
+        body = json.dumps(envelope, separators=(',', ':')).encode('utf-8')
+        gzipped, gzip_us = timed(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), args.repeat // 10 or 1)
+        projected = json.dumps({
+            'file_id': envelope['file_id'],
+            'analysis': project_fields(analysis, parse_fields(SCORES_ONLY))
+        }).encode('utf-8')
+
+        row = {
+            'file': os.path.basename(path),
+            'disk_pretty': len(pretty.encode('utf-8')),
+            'disk_compact': len(compact.encode('utf-8')),
+            'dump_pretty_us': pretty_us,
+            'dump_compact_us': compact_us,
+            'load_pretty_us': load_pretty_us,
+            'load_compact_us': load_compact_us,
+            'response_full': len(body),
+            'response_gzip': len(gzipped),
+            'gzip_us': gzip_us,
+            'response_projected': len(projected)
+        }
+        if brotli is not None:
+            compressed, br_us = timed(lambda: brotli.compress(body, quality=BROTLI_QUALITY), args.repeat // 10 or 1)
+            row['response_br'] = len(compressed)
+            row['br_us'] = br_us
+        rows.append(row)
+
+    for row in rows:
+        print(row['file'])
+        print(f"  on disk:   {row['disk_pretty']:>7} B indent=2  -> {row['disk_compact']:>7} B compact "
+              f"({row['disk_compact'] / row['disk_pretty']:.0%})")
+        print(f"  json.dump: {row['dump_pretty_us']:>7.1f} us indent=2 -> {row['dump_compact_us']:>7.1f} us compact")
+        print(f"  json.load: {row['load_pretty_us']:>7.1f} us indent=2 -> {row['load_compact_us']:>7.1f} us compact")
+        print(f"  response:  {row['response_full']:>7} B full")
+        print(f"             {row['response_gzip']:>7} B gzip ({row['gzip_us']:.1f} us)")
+        if 'response_br' in row:
+            print(f"             {row['response_br']:>7} B br ({row['br_us']:.1f} us)")
+        else:
+            print("             br skipped (brotli not installed)")
+        print(f"             {row['response_projected']:>7} B ?fields={SCORES_ONLY}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
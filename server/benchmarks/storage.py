@@ -0,0 +1,108 @@
+"""Compressed artifact storage: compression ratio and read/write throughput.
+
+Extracts text from generated PDF resumes and runs the structural analysis
+on it. The extracted text and the analysis JSON are then written through
+routes/services/compressed_storage.py at several gzip levels (level 0 is
+the previous uncompressed layout) and read back. The script reports stored
+size, compression ratio and throughput over uncompressed bytes. It also
+times PDF extraction from a plain file handle against the read-only memory
+map that uploaded originals are now opened through.
+
+Usage (from the server directory):
+    python benchmarks/storage.py [--docs N] [--pages N] [--levels 0,1,6,9]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import PyPDF2
+
+from load_test import make_pdf
+from routes.services.compressed_storage import CompressedStore, mapped_original
+from routes.services.resume_analyzer import ResumeAnalyzer
+
+
+def build_artifacts(directory, docs, pages):
+    analyzer = ResumeAnalyzer()
+    artifacts = []
+    for seed in range(docs):
+        path = os.path.join(directory, f"{seed}.pdf")
+        with open(path, 'wb') as f:
+            f.write(make_pdf(pages, seed))
+        text = analyzer.extract_text(path, 'pdf')
+        analysis = analyzer.analyze_text(text, 'pdf')
+        artifacts.append((path, text, json.dumps(analysis, separators=(',', ':')).encode('utf-8')))
+    return artifacts
+
+
+def measure_level(directory, artifacts, level):
+    store = CompressedStore(level=level)
+    target = os.path.join(directory, f"level-{level}")
+    os.makedirs(target)
+
+    for index, (_, text, analysis) in enumerate(artifacts):
+        store.write_text(os.path.join(target, f"{index}_text.txt"), text)
+        store.write(os.path.join(target, f"{index}_analysis.json"), analysis)
+    for index in range(len(artifacts)):
+        store.read_text(os.path.join(target, f"{index}_text.txt"))
+        store.read(os.path.join(target, f"{index}_analysis.json"))
+
+    return store.stats()
+
+
+def extract_pages(source):
+    return sum(len(page.extract_text()) for page in PyPDF2.PdfReader(source).pages)
+
+
+def measure_originals(artifacts):
+    timings = {}
+    for name in ('file handle', 'mmap'):
+        start = time.perf_counter()
+        for path, _, _ in artifacts:
+            if name == 'mmap':
+                with mapped_original(path) as view:
+                    extract_pages(view)
+            else:
+                with open(path, 'rb') as f:
+                    extract_pages(f)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=50)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--levels', default='0,1,6,9')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='storage-bench-')
+    try:
+        artifacts = build_artifacts(directory, args.docs, args.pages)
+        logical = sum(len(text.encode('utf-8')) + len(analysis) for _, text, analysis in artifacts)
+        print(f"{args.docs} documents of {args.pages} pages, {logical / args.docs / 1024:.1f} KiB of text and "
+              f"analysis each")
+        print(f"  {'level':<7}{'stored KiB':>12}{'ratio':>8}{'write MB/s':>12}{'read MB/s':>11}")
+
+        for level in [int(level) for level in args.levels.split(',')]:
+            stats = measure_level(directory, artifacts, level)
+            stored = stats['write']['stored_bytes']
+            print(f"  {level:<7}{stored / 1024:>12.1f}{stats['compression_ratio']:>8.2f}"
+                  f"{stats['write']['mb_per_second']:>12.1f}{stats['read']['mb_per_second']:>11.1f}")
+
+        timings = measure_originals(artifacts)
+        for name, elapsed in timings.items():
+            print(f"  PDF extraction via {name:<12} {args.docs / elapsed:>8.1f} docs/s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Tokenizer equivalence with NLTK and throughput of the shared regex engine.
+
+The equivalence suite compares routes/services/tokenizer.py with NLTK's
+Treebank word tokenizer (the tokenizer word_tokenize runs after punkt splits
+sentences) and exits non-zero on any unexpected difference:
+
+  * CASES must tokenize identically, one sentence per case;
+  * DIVERGENCES are the deliberate differences, each checked against the
+    output we expect from the engine;
+  * generated resumes must yield the same keyword candidates (alphabetic,
+    3+ characters, not a stop word) line by line;
+  * KEYWORD_CASES must yield the expected technical and industry keywords
+    through KeywordExtractor, which the alphabetic filter above cannot check for
+    joined tokens such as slash lists.
+
+The benchmark then times NLTK and the engine over the same documents.
+
+Usage (from the server directory):
+    python benchmarks/tokenizer.py [--docs N] [--seed N] [--skip-benchmark]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+
+from routes.services.keyword_extractor import KeywordExtractor
+from routes.services.tokenizer import tokenize
+
+
+CASES = [
+    'Developed scalable microservices and reduced latency by 35%.',
+    'Built apps with Node.js, Vue.js and .NET; maintained CI/CD pipelines.',
+    "Led the company's migration to AWS and didn't miss a deadline.",
+    "We can't, won't and shouldn't ship untested code.",
+    'Served 1,000 users between 2019-2021 (remote).',
+    'Improved well-known tools, e.g. pytest and tox.',
+    'Worked at Acme Inc. as a Senior Software Engineer.',
+    'Skills: Python, Java, JavaScript, SQL Server, Go, Rust',
+    'Contact: jane.doe@example.com | (555) 123-4567',
+    'Reduced costs by $25,000 per year -- a 12.5% saving!',
+    'Managed a team of 6 engineers? Yes: two of them were interns.',
+    'Mentored juniors; reviewed 300+ pull requests.',
+]
+
+# (text, tokens from NLTK, tokens from the engine)
+DIVERGENCES = [
+    ('Wrote C# services.',
+     ['wrote', 'c', '#', 'services', '.'],
+     ['wrote', 'c#', 'services', '.']),
+    ('Languages: F# and C++',
+     ['languages', ':', 'f', '#', 'and', 'c++'],
+     ['languages', ':', 'f#', 'and', 'c++']),
+    # Quotes stay as typed instead of becoming `` and ''
+    ('Known as "the fixer" internally.',
+     ['known', 'as', '``', 'the', 'fixer', "''", 'internally', '.'],
+     ['known', 'as', '"', 'the', 'fixer', '"', 'internally', '.']),
+    # NLTK only splits the period that ends a sentence; punkt decides where that
+    # is, the engine splits a period before a capitalised word or a line end
+    ('Joined Acme Inc. Promoted twice.',
+     ['joined', 'acme', 'inc.', 'promoted', 'twice', '.'],
+     ['joined', 'acme', 'inc', '.', 'promoted', 'twice', '.']),
+    # NLTK keeps every slash join; the engine only keeps SLASH_COMPOUNDS whole
+    ('Python/Django, HTML/CSS and CI/CD.',
+     ['python/django', ',', 'html/css', 'and', 'ci/cd', '.'],
+     ['python', '/', 'django', ',', 'html', '/', 'css', 'and', 'ci/cd', '.']),
+]
+
+# (text, technical and industry keywords KeywordExtractor must find, flattened across categories)
+KEYWORD_CASES = [
+    ('Skills: Python/Django, HTML/CSS, AWS/GCP, React/Redux',
+     {'python', 'django', 'html', 'css', 'aws', 'gcp', 'react'}),
+    ('Automated CI/CD and debugged TCP/IP stacks',
+     {'ci/cd'}),
+]
+
+FILLER = (
+    'developed implemented managed designed optimized scalable microservices architecture '
+    "collaborated cross-functional teams company's customer-facing features didn't reduced "
+    'latency by 35% improved reliability e.g. automated CI/CD pipelines mentored engineers '
+    'node.js .NET C++ python javascript react postgresql kubernetes docker aws 1,000 users '
+    'the a and of to for with on in by across within using while (2019-2021) 12.5%'
+).split()
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he', 'in', 'is',
+    'it', 'its', 'of', 'on', 'that', 'the', 'to', 'was', 'will', 'with', 'would'
+}
+
+
+def make_resume(rng):
+    lines = ['Jane Doe', 'jane.doe@example.com | (555) 123-4567']
+    for header in ['SUMMARY', 'EXPERIENCE', 'SKILLS', 'PROJECTS']:
+        lines.append(header)
+        for _ in range(rng.randint(4, 10)):
+            words = rng.choices(FILLER, k=rng.randint(6, 20))
+            words[0] = words[0].capitalize()
+            lines.append('• ' + ' '.join(words) + rng.choice(['.', '', ';']))
+    return '\n'.join(lines)
+
+
+def keyword_candidates(tokens):
+    return [token for token in tokens if token not in STOP_WORDS and len(token) >= 3 and token.isalpha()]
+
+
+def nltk_tokens(treebank, text):
+    return [token.lower() for token in treebank.tokenize(text)]
+
+
+def check_equivalence(treebank, docs):
+    failures = []
+    extractor = KeywordExtractor()
+
+    for text in CASES:
+        expected, actual = nltk_tokens(treebank, text), tokenize(text)
+        if expected != actual:
+            failures.append(f"case {text!r}\n    nltk:   {expected}\n    engine: {actual}")
+
+    for text, expected_nltk, expected_engine in DIVERGENCES:
+        if nltk_tokens(treebank, text) != expected_nltk:
+            failures.append(f"divergence {text!r}: NLTK now gives {nltk_tokens(treebank, text)}")
+        if tokenize(text) != expected_engine:
+            failures.append(f"divergence {text!r}: engine gives {tokenize(text)}")
+
+    for text, expected in KEYWORD_CASES:
+        found = {keyword
+                 for matches in (extractor.extract_technical_keywords(text), extractor.extract_industry_keywords(text))
+                 for keywords in matches.values() for keyword in keywords}
+        if not expected <= found:
+            failures.append(f"keywords {text!r}: missing {sorted(expected - found)}, found {sorted(found)}")
+
+    lines = [line for doc in docs for line in doc.splitlines() if line.strip()]
+    for line in lines:
+        expected = keyword_candidates(nltk_tokens(treebank, line))
+        actual = keyword_candidates(tokenize(line))
+        if expected != actual:
+            failures.append(f"resume line {line!r}\n    nltk:   {expected}\n    engine: {actual}")
+
+    print(f"{len(CASES)} identical cases, {len(DIVERGENCES)} documented divergences, "
+          f"{len(KEYWORD_CASES)} keyword cases, {len(lines)} resume lines compared")
+    return failures
+
+
+def benchmark(treebank, docs):
+    try:
+        word_tokenize('Punkt check.')
+        tokenizers = [('nltk word_tokenize', word_tokenize)]
+    except LookupError:
+        # Without punkt data word_tokenize cannot run at all; time the Treebank stage alone
+        tokenizers = [('nltk treebank (no punkt)', treebank.tokenize)]
+    tokenizers.append(('regex engine', tokenize))
+
+    chars = sum(len(doc) for doc in docs)
+    baseline = None
+    for name, tokenizer in tokenizers:
+        start = time.perf_counter()
+        for doc in docs:
+            tokenizer(doc)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  {name:<26} {len(docs) / elapsed:>9.1f} docs/s  {chars / elapsed / 1e6:>6.2f} MB/s"
+              f"  {baseline / elapsed:>5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--skip-benchmark', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_resume(rng) for _ in range(args.docs)]
+    treebank = NLTKWordTokenizer()
+
+    failures = check_equivalence(treebank, docs)
+    for failure in failures[:20]:
+        print('  MISMATCH ' + failure)
+    if failures:
+        print(f"{len(failures)} mismatches")
+        return 1
+    print('  equivalent')
+
+    if not args.skip_benchmark:
+        print(f"{args.docs} documents, ~{sum(len(doc) for doc in docs) // args.docs} chars each")
+        benchmark(treebank, docs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())